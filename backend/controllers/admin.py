@@ -1,13 +1,30 @@
-from blacksheep import json
+from blacksheep import json, Request
 from blacksheep.server.controllers import APIController, get, post
-from services.crawler_service import CrawlerService
+from services.crawler_service import CrawlerService, pipeline_stats
+from services.feed_service import matching_stats
 from services.firestore_service import FirestoreService
+from services.scheduler_service import SchedulerService
+from services.seen_video_service import SeenVideoService
+from services.youtube_quota_service import YoutubeQuotaService
+from services.youtube_service import YoutubeService
+from utils.concurrency import concurrency
+from utils.llm_gateway import llm_gateway
 
 
 class Admin(APIController):
-    def __init__(self, crawler_service: CrawlerService, firestore_service: FirestoreService):
+    def __init__(
+        self,
+        crawler_service: CrawlerService,
+        firestore_service: FirestoreService,
+        quota_service: YoutubeQuotaService,
+        seen_service: SeenVideoService,
+        scheduler_service: SchedulerService,
+    ):
         self.crawler_service = crawler_service
         self.firestore_service = firestore_service
+        self.quota_service = quota_service
+        self.seen_service = seen_service
+        self.scheduler_service = scheduler_service
 
     @classmethod
     def route(cls):
@@ -21,6 +38,28 @@ class Admin(APIController):
         )
         return json({"status": "done", "videos_added": added})
 
+    @post("/crawl-run")
+    async def crawl_run(self, request: Request):
+        try:
+            data = await request.json() or {}
+        except Exception:
+            data = {}
+        queries = data.get("queries") or []
+        if isinstance(queries, str):
+            queries = [q for q in queries.split("|") if q.strip()]
+        result = await self.crawler_service.crawl_run(
+            queries=queries or None,
+            max_videos_per_query=int(data.get("max_videos_per_query", 50)),
+            include_resting=bool(data.get("include_resting", False)),
+        )
+        return json({"status": "done", **result})
+
+    @get("/crawl-queries")
+    async def crawl_queries(self):
+        states = await self.firestore_service.list_crawl_query_states()
+        states.sort(key=lambda s: -sum(s.get("recent_yields") or []))
+        return json(states)
+
     @post("/cleanup")
     async def cleanup(self, max_age_hours: int = 24):
         count = await self.crawler_service.cleanup_stale(max_age_hours)
@@ -75,3 +114,48 @@ class Admin(APIController):
     async def pool_stats(self):
         stats = await self.firestore_service.get_pool_stats()
         return json(stats)
+
+    @get("/quota")
+    async def quota(self):
+        return json(await self.quota_service.status())
+
+    @get("/seen")
+    async def seen(self):
+        return json(self.seen_service.stats())
+
+    @post("/seen/checkpoint")
+    async def seen_checkpoint(self):
+        await self.seen_service.checkpoint()
+        return json({"status": "done", **self.seen_service.stats()})
+
+    @get("/scheduler")
+    async def scheduler(self):
+        return json({
+            **self.scheduler_service.status(),
+            "history": await self.firestore_service.get_job_runs(),
+        })
+
+    @post("/scheduler/run")
+    async def scheduler_run(self, job: str = ""):
+        if job not in self.scheduler_service.jobs:
+            return json({"error": f"unknown job, expected one of {sorted(self.scheduler_service.jobs)}"}, status=400)
+        return json(await self.scheduler_service.run_job(job))
+
+    @get("/pipeline")
+    async def pipeline(self):
+        return json(pipeline_stats())
+
+    @get("/concurrency")
+    async def concurrency_stats(self):
+        return json(concurrency.stats())
+
+    @get("/llm")
+    async def llm_stats(self):
+        return json(llm_gateway.stats())
+
+    @get("/matching")
+    async def matching(self):
+        return json({
+            **matching_stats(),
+            "channel_thumbnail_cache": YoutubeService.channel_cache_stats(),
+        })
@@ -1,9 +1,19 @@
 # Job controller for video generation pipeline
+import asyncio
+import time
 from datetime import datetime
 from blacksheep import json
 from blacksheep.server.controllers import APIController, post, get
+from blacksheep.server.sse import ServerSentEvent, ServerSentEventsResponse
 from services.job_service import JobService
 from models.job import VideoJobRequest
+from services.job_status_service import TERMINAL_STATUSES
+from utils.image_ingest import image_ingest
+
+MAX_BATCH_IDS = 50
+MAX_LONG_POLL_SECONDS = 25.0
+MAX_STREAM_SECONDS = 900.0
+
 
 def log_api(endpoint: str, msg: str):
     print(f"[{datetime.now().isoformat()}] [API] {endpoint}: {msg}", flush=True)
@@ -36,6 +46,34 @@ class Jobs(APIController):
     async def health_check(self):
         return json({"status": "ok"})
 
+    @get("/veo-poller")
+    async def veo_poller_stats(self):
+        return json(self.job_service.veo_poller.stats())
+
+    @get("/workers")
+    async def worker_stats(self):
+        return json(self.job_service.worker_stats())
+
+    @get("/render-index")
+    async def render_index_stats(self):
+        return json(self.job_service.render_index.stats())
+
+    @get("/frame-cache")
+    async def frame_cache_stats(self):
+        return json(self.job_service.frame_cache.stats())
+
+    @get("/vertex")
+    async def vertex_stats(self):
+        return json(self.job_service.vertex_service.stats())
+
+    @get("/store")
+    async def job_store_stats(self):
+        return json({"store": self.job_service.job_store.stats(), "status_cache": self.job_service.job_status.stats()})
+
+    @get("/image-cache")
+    async def image_cache_stats(self):
+        return json(image_ingest.stats())
+
     @post("/create")
     async def create_job(self, request):
         log_api("/create", "========== REQUEST RECEIVED ==========")
@@ -95,7 +133,53 @@ class Jobs(APIController):
         )
 
         log_api("/create", "Creating video job...")
-        job_id = await self.job_service.create_video_job(job_request)
+        try:
+            job_id = await self.job_service.create_video_job(job_request)
+        except asyncio.QueueFull:
+            log_api("/create", "ERROR: Local job queue is full")
+            return json({"error": "job queue is full, try again shortly"}, status=503)
         log_api("/create", f"Job created: {job_id}")
         log_api("/create", "Job queued to worker - pipeline starting in background")
         return json({"job_id": job_id})
+
+    @get()
+    async def get_jobs(self, ids: str = ""):
+        job_ids = [i.strip() for i in ids.split(",") if i.strip()][:MAX_BATCH_IDS]
+        if not job_ids:
+            return json({"error": "ids required"}, status=400)
+        return json({"jobs": await self.job_service.get_job_statuses(job_ids)})
+
+    # ?wait=N long-polls until the job moves past ?version (or ends)
+    @get("/{job_id}")
+    async def get_job(self, job_id: str, wait: float = 0, version: int = 0):
+        if wait > 0:
+            entry = await self.job_service.wait_for_job_status(job_id, version, min(wait, MAX_LONG_POLL_SECONDS))
+        else:
+            entry = await self.job_service.get_job_status(job_id)
+        if entry is None:
+            return json({"error": "job not found"}, status=404)
+        return json(entry)
+
+    @get("/{job_id}/events")
+    async def job_events(self, job_id: str):
+        if await self.job_service.get_job_status(job_id) is None:
+            return json({"error": "job not found"}, status=404)
+        job_service = self.job_service
+
+        async def events():
+            version = 0
+            deadline = time.monotonic() + MAX_STREAM_SECONDS
+            while time.monotonic() < deadline:
+                entry = await job_service.wait_for_job_status(job_id, version, MAX_LONG_POLL_SECONDS)
+                if entry is None:
+                    return
+                if entry["version"] > version:
+                    version = entry["version"]
+                    yield ServerSentEvent(entry, event="status", id=str(version))
+                    if entry.get("status") in TERMINAL_STATUSES:
+                        return
+                else:
+                    # keeps proxies from closing an idle stream
+                    yield ServerSentEvent({"version": version}, event="ping")
+
+        return ServerSentEventsResponse(events)
@@ -1,5 +1,7 @@
-from blacksheep import Request, json
+import json as jsonlib
+from blacksheep import Request, Response, StreamedContent, json
 from blacksheep.server.controllers import APIController, get, post
+from blacksheep.server.sse import ServerSentEvent, ServerSentEventsResponse
 from services.feed_service import FeedService
 
 class Shorts(APIController):
@@ -55,24 +57,98 @@ class Shorts(APIController):
         except Exception as e:
             return json({"error": str(e)}, status=500)
         
+    @staticmethod
+    def _parse_advice_body(data: dict) -> dict:
+        return {
+            "question": data.get("question", ""),
+            "side": data.get("side", "YES"),
+            "amount": data.get("amount", 0),
+            "yes_price": data.get("yes_price", 50),
+            "no_price": data.get("no_price", 50),
+        }
+
     @post("/advice")
     async def get_advice(self, request: Request):
         try:
             data = await request.json()
         except Exception:
             return json({"error": "Invalid JSON body"}, status=400)
-        question = data.get("question", "")
-        side = data.get("side", "YES")
-        amount = data.get("amount", 0)
-        yes_price = data.get("yes_price", 50)
-        no_price = data.get("no_price", 50)
-        if not question:
+        params = self._parse_advice_body(data)
+        if not params["question"]:
             return json({"error": "question is required"}, status=400)
-        advice = await self.feed_service.get_trade_advice(
-            question, side, amount, yes_price, no_price
-        )
+        advice = await self.feed_service.get_trade_advice(**params)
         return json({"advice": advice})
-    
+
+    @post("/advice/stream")
+    async def stream_advice(self, request: Request):
+        try:
+            data = await request.json()
+        except Exception:
+            return json({"error": "Invalid JSON body"}, status=400)
+        params = self._parse_advice_body(data)
+        if not params["question"]:
+            return json({"error": "question is required"}, status=400)
+
+        feed_service = self.feed_service
+
+        async def events():
+            parts = []
+            async for token in feed_service.stream_trade_advice(**params):
+                parts.append(token)
+                yield ServerSentEvent({"text": token}, event="token")
+            yield ServerSentEvent({"advice": "".join(parts).strip()}, event="done")
+
+        return ServerSentEventsResponse(events)
+
+    @get("/feed/stream")
+    async def stream_feed(
+        self,
+        video_ids: str = "",
+        limit: int = 10,
+        format: str = "ndjson",
+        item_timeout: float = 0,
+    ):
+        if not video_ids:
+            return json({"error": "video_ids required"}, status=400)
+        ids = [v.strip() for v in video_ids.split(",") if v.strip()][:limit]
+        if not ids:
+            return json({"error": "No valid video_ids provided"}, status=400)
+        if format not in ("ndjson", "sse"):
+            return json({"error": "format must be ndjson or sse"}, status=400)
+
+        feed_service = self.feed_service
+        timeout = item_timeout if item_timeout > 0 else None
+
+        async def feed_items():
+            position = 0
+            async for item in feed_service.stream_feed(ids, item_timeout=timeout):
+                position += 1
+                yield {
+                    "id": str(position),
+                    "youtube": item["youtube"],
+                    "kalshi": item["kalshi"],
+                }
+
+        if format == "sse":
+            async def events():
+                count = 0
+                async for entry in feed_items():
+                    count += 1
+                    yield ServerSentEvent(entry, event="item", id=entry["id"])
+                yield ServerSentEvent({"count": count, "requested": len(ids)}, event="done")
+
+            return ServerSentEventsResponse(events)
+
+        async def lines():
+            async for entry in feed_items():
+                yield (jsonlib.dumps(entry) + "\n").encode("utf-8")
+
+        return Response(
+            200,
+            [(b"Cache-Control", b"no-cache")],
+            StreamedContent(b"application/x-ndjson", lines),
+        )
+
     @get("/feed")
     async def get_feed(self, video_ids: str = "", limit: int = 10):
         if not video_ids:
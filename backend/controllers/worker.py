@@ -43,16 +43,42 @@ class Worker(APIController):
         except Exception:
             data = {}
         query = data.get("query")
-        max_videos = data.get("max_videos", 10)
+        try:
+            max_videos = int(data.get("max_videos", 10))
+        except (TypeError, ValueError):
+            return json({"error": "max_videos must be an integer"}, status=400)
         added = await self.crawler_service.crawl_and_match(query=query, max_videos=max_videos)
         return json({"status": "done", "videos_added": added})
 
+    @post("/crawl-run")
+    async def crawl_run(self, request: Request) -> Response:
+        try:
+            data = await request.json() or {}
+        except Exception:
+            data = {}
+        queries = data.get("queries") or []
+        if isinstance(queries, str):
+            queries = [q for q in queries.split("|") if q.strip()]
+        try:
+            max_videos_per_query = int(data.get("max_videos_per_query", 50))
+        except (TypeError, ValueError):
+            return json({"error": "max_videos_per_query must be an integer"}, status=400)
+        result = await self.crawler_service.crawl_run(
+            queries=queries or None,
+            max_videos_per_query=max_videos_per_query,
+            include_resting=bool(data.get("include_resting", False)),
+        )
+        return json({"status": "done", **result})
+
     @post("/cleanup")
     async def cleanup(self, request: Request) -> Response:
         try:
             data = await request.json()
         except Exception:
             data = {}
-        max_age_hours = data.get("max_age_hours", 24)
+        try:
+            max_age_hours = int(data.get("max_age_hours", 24))
+        except (TypeError, ValueError):
+            return json({"error": "max_age_hours must be an integer"}, status=400)
         count = await self.crawler_service.cleanup_stale(max_age_hours)
         return json({"status": "done", "deactivated": count})
@@ -0,0 +1,99 @@
+# Local stand-in for the YouTube Data API v3 (search / videos / channels).
+# Lets the crawler and quota ledger run offline without burning real quota.
+#
+# Usage: python scripts/fake_youtube_api.py [port]
+#   then start the backend with YOUTUBE_API_URL=http://localhost:8090/youtube/v3
+import hashlib
+import sys
+from datetime import datetime, timedelta, timezone
+from aiohttp import web
+
+UNIT_COSTS = {"search": 100, "videos": 1, "channels": 1}
+TOPICS = [
+    ("Bitcoin price today", ["bitcoin", "crypto"], "25"),
+    ("NBA buzzer beater", ["nba", "basketball"], "17"),
+    ("Fed rate decision explained", ["fed", "inflation"], "25"),
+    ("Hurricane season update", ["weather", "hurricane"], "25"),
+    ("Nvidia earnings reaction", ["nvidia", "stocks"], "28"),
+]
+
+units_used: dict[str, int] = {}
+
+
+def _charge(endpoint: str) -> None:
+    units_used[endpoint] = units_used.get(endpoint, 0) + UNIT_COSTS[endpoint]
+
+
+def _video_id(seed: str) -> str:
+    return hashlib.sha1(seed.encode()).hexdigest()[:11]
+
+
+def _topic(video_id: str) -> tuple[str, list[str], str]:
+    return TOPICS[int(video_id, 16) % len(TOPICS)]
+
+
+async def search(request: web.Request) -> web.Response:
+    _charge("search")
+    query = request.query.get("q", "")
+    max_results = min(int(request.query.get("maxResults", 5)), 50)
+    page = int(request.query.get("pageToken") or 0)
+    published_after = request.query.get("publishedAfter")
+    # pretend a few new uploads appear every hour
+    hour = datetime.now(timezone.utc).strftime("%Y%m%d%H")
+    seeds = [f"{query}:{hour if published_after else 'all'}:{page}:{i}" for i in range(max_results)]
+    return web.json_response({
+        "items": [{"id": {"kind": "youtube#video", "videoId": _video_id(s)}} for s in seeds],
+        "nextPageToken": str(page + 1),
+    })
+
+
+async def videos(request: web.Request) -> web.Response:
+    _charge("videos")
+    items = []
+    for video_id in request.query.get("id", "").split(","):
+        if not video_id:
+            continue
+        title, tags, category = _topic(video_id)
+        published = datetime.now(timezone.utc) - timedelta(hours=int(video_id, 16) % 48)
+        items.append({
+            "id": video_id,
+            "snippet": {
+                "title": f"{title} #{video_id[:4]}",
+                "description": f"Fake short about {title.lower()}",
+                "channelId": f"UC{video_id[:6]}",
+                "channelTitle": f"Channel {video_id[:3]}",
+                "tags": tags,
+                "categoryId": category,
+                "publishedAt": published.isoformat().replace("+00:00", "Z"),
+                "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}},
+            },
+            "status": {"embeddable": int(video_id, 16) % 10 != 0},
+        })
+    return web.json_response({"items": items})
+
+
+async def channels(request: web.Request) -> web.Response:
+    _charge("channels")
+    items = [
+        {"id": cid, "snippet": {"thumbnails": {"default": {"url": f"https://yt3.ggpht.com/{cid}"}}}}
+        for cid in request.query.get("id", "").split(",") if cid
+    ]
+    return web.json_response({"items": items})
+
+
+async def quota(request: web.Request) -> web.Response:
+    return web.json_response({"used": sum(units_used.values()), "by_endpoint": units_used})
+
+
+def main() -> None:
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8090
+    app = web.Application()
+    app.router.add_get("/youtube/v3/search", search)
+    app.router.add_get("/youtube/v3/videos", videos)
+    app.router.add_get("/youtube/v3/channels", channels)
+    app.router.add_get("/quota", quota)
+    web.run_app(app, port=port)
+
+
+if __name__ == "__main__":
+    main()
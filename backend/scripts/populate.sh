@@ -109,16 +109,20 @@ echo "Max videos per query: $MAX_VIDEOS"
 echo "Queries: ${#QUERIES[@]}"
 echo ""
 
-TOTAL=0
-for query in "${QUERIES[@]}"; do
-  encoded=$(python3 -c "import urllib.parse,sys; print(urllib.parse.quote(sys.argv[1]))" "$query")
-  echo "[$((TOTAL))+ ] Crawling: '$query'..."
-  RESULT=$(curl -s -X POST "$API_URL/admin/crawl?query=${encoded}&max_videos=$MAX_VIDEOS")
-  ADDED=$(echo "$RESULT" | python3 -c "import sys,json; print(json.load(sys.stdin).get('videos_added',0))" 2>/dev/null || echo "0")
-  echo "  → Added: $ADDED"
-  TOTAL=$((TOTAL + ADDED))
-  sleep 1
-done
+# one crawl run: every query is searched concurrently, results are merged and
+# de-duplicated server-side, and matching is paced by the backend's adaptive limiter
+PAYLOAD=$(python3 -c "import json,sys; print(json.dumps({'queries': sys.argv[2:], 'max_videos_per_query': int(sys.argv[1])}))" "$MAX_VIDEOS" "${QUERIES[@]}")
+RESULT=$(curl -s -X POST "$API_URL/admin/crawl-run" -H "Content-Type: application/json" -d "$PAYLOAD")
+echo "$RESULT" | python3 -c "
+import sys, json
+r = json.load(sys.stdin)
+for q in r.get('queries', []):
+    print(f\"  {q['query']!r}: found {q.get('found', 0)}, new {q.get('new', 0)}, added {q.get('added', 0)} ({q.get('search_ms', 0)}ms search)\")
+for q in r.get('deferred', []):
+    print(f'  {q!r}: deferred (quota)')
+print(f\"Elapsed: {r.get('elapsed_s', 0)}s\")
+" 2>/dev/null || echo "$RESULT"
+TOTAL=$(echo "$RESULT" | python3 -c "import sys,json; print(json.load(sys.stdin).get('videos_added',0))" 2>/dev/null || echo "0")
 
 echo ""
 echo "Done. Total videos added: $TOTAL"
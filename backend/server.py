@@ -11,7 +11,15 @@ from services.crawler_service import CrawlerService
 from services.feed_service import FeedService
 from services.firestore_service import FirestoreService
 from services.job_service import JobService
+from services.scheduler_service import SchedulerService
+from services.seen_video_service import SeenVideoService
+from services.frame_cache_service import FrameCacheService
+from services.job_status_service import JobStatusService
+from services.job_store_service import JobStoreService
+from services.render_index_service import RenderIndexService
+from services.veo_poller_service import VeoPollerService
 from services.vertex_service import VertexService
+from services.youtube_quota_service import YoutubeQuotaService
 from services.youtube_service import YoutubeService
 from services.kalshi_service import KalshiService
 
@@ -20,9 +28,17 @@ services.add_scoped(YoutubeService)
 services.add_scoped(KalshiService)
 services.add_scoped(FeedService)
 services.add_singleton(FirestoreService)
+services.add_singleton(YoutubeQuotaService)
+services.add_singleton(SeenVideoService)
 services.add_scoped(CrawlerService)
 services.add_singleton(VertexService)
+services.add_singleton(VeoPollerService)
+services.add_singleton(RenderIndexService)
+services.add_singleton(FrameCacheService)
+services.add_singleton(JobStatusService)
+services.add_singleton(JobStoreService)
 services.add_singleton(JobService)
+services.add_singleton(SchedulerService)
 
 app = Application(services=services)
 
@@ -31,3 +47,42 @@ app.use_cors(
     allow_origins="*",
     allow_headers="*",
 )
+
+
+# pool upkeep; crawler/feed are scoped, so each run resolves fresh instances
+@app.after_start
+async def start_scheduler(application: Application) -> None:
+    scheduler = application.services.resolve(SchedulerService)
+    scheduler.add_job(
+        "crawl",
+        settings.SCHEDULER_CRAWL_INTERVAL,
+        lambda: application.services.resolve(CrawlerService).crawl_run(),
+    )
+    scheduler.add_job(
+        "cleanup",
+        settings.SCHEDULER_CLEANUP_INTERVAL,
+        lambda: _cleanup(application.services.resolve(CrawlerService)),
+    )
+    scheduler.add_job(
+        "reprice",
+        settings.SCHEDULER_REPRICE_INTERVAL,
+        lambda: application.services.resolve(FeedService).reprice_pool(),
+    )
+    scheduler.add_job(
+        "frame-cache-evict",
+        settings.SCHEDULER_FRAME_EVICT_INTERVAL,
+        lambda: application.services.resolve(FrameCacheService).evict(),
+    )
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+
+
+@app.on_stop
+async def stop_scheduler(application: Application) -> None:
+    await application.services.resolve(SchedulerService).stop()
+    # write-behind job updates still sitting in memory
+    await application.services.resolve(JobStoreService).flush_all()
+
+
+async def _cleanup(crawler: CrawlerService) -> dict:
+    return {"deactivated": await crawler.cleanup_stale()}
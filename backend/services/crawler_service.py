@@ -1,11 +1,16 @@
-import asyncio
+import hashlib
 import random
-from datetime import datetime, timezone
-import aiohttp
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from services.feed_service import FeedService
 from services.firestore_service import FirestoreService
+from services.seen_video_service import ADDED, NO_MATCH, NOT_EMBEDDABLE, SeenVideoService
+from services.youtube_quota_service import YoutubeQuotaService
 from services.youtube_service import YoutubeService
+from utils.concurrency import AdaptiveLimiter, batch_priority
 from utils.env import settings
+from utils.pipeline import Pipeline, Stage
 
 SEARCH_QUERIES = [
     # Crypto
@@ -35,6 +40,42 @@ SEARCH_QUERIES = [
     "chatgpt news shorts",
 ]
 
+# a query that surfaces nothing new this many runs in a row is rested, with exponential backoff
+DRY_STREAK_LIMIT = 3
+_DRY_BACKOFF_BASE = timedelta(hours=1)
+_DRY_BACKOFF_MAX = timedelta(hours=24)
+_RECENT_YIELDS = 5
+# pages walked inside one publishedAfter window before the watermark is moved up anyway
+_MAX_PAGES_PER_WINDOW = 4
+_CLOSED_WINDOW = {
+    "page_token": None,
+    "window_after": None,
+    "window_started_at": None,
+    "window_pages": 0,
+    "window_max_results": None,
+}
+
+
+def query_id(query: str) -> str:
+    return hashlib.sha1(query.strip().lower().encode()).hexdigest()[:16]
+
+
+def _rfc3339(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def is_resting(state: Optional[dict], now: Optional[datetime] = None) -> bool:
+    skip_until = (state or {}).get("skip_until")
+    return bool(skip_until) and skip_until > (now or datetime.now(timezone.utc))
+
+
+# latest pipeline of each kind, kept around so its per-stage stats can be inspected
+_pipelines: dict[str, Pipeline] = {}
+
+
+def pipeline_stats() -> dict:
+    return {name: pipeline.stats() for name, pipeline in _pipelines.items()}
+
 
 class CrawlerService:
     def __init__(
@@ -42,112 +83,295 @@ class CrawlerService:
         feed_service: FeedService,
         firestore_service: FirestoreService,
         youtube_service: YoutubeService,
+        quota_service: YoutubeQuotaService,
+        seen_service: SeenVideoService,
     ) -> None:
         self.feed_service = feed_service
         self.firestore_service = firestore_service
         self.youtube_service = youtube_service
-        self.api_key = settings.YOUTUBE_API_KEY
-
-    async def search_youtube_shorts(self, query: str, max_results: int = 10) -> list[str]:
-        url = "https://www.googleapis.com/youtube/v3/search"
-        params = {
-            "part": "id",
-            "q": query,
-            "type": "video",
-            "videoDuration": "short",
-            "videoEmbeddable": "true",
-            "order": "relevance",
-            "maxResults": max_results,
-            "key": self.api_key,
-        }
+        self.quota_service = quota_service
+        self.seen_service = seen_service
+
+    async def search_youtube_shorts(
+        self, query: str, max_results: int = 10, check_embeddable: bool = True
+    ) -> list[str]:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-            video_ids = []
-            for item in data.get("items", []):
-                vid = item.get("id", {}).get("videoId")
-                if vid:
-                    video_ids.append(vid)
-
-            if video_ids:
+            video_ids = await self.youtube_service.search_shorts(query, max_results=max_results)
+            if video_ids and check_embeddable:
                 video_ids = await self.youtube_service.batch_check_embeddable(video_ids)
-
             return video_ids
         except Exception as e:
             print(f"[crawler] YouTube search failed for '{query}': {e}")
             return []
 
+    async def _load_query_states(self, queries: list[str]) -> dict[str, dict]:
+        try:
+            states = await self.firestore_service.get_crawl_query_states(
+                [query_id(q) for q in queries]
+            )
+        except Exception as e:
+            print(f"[crawler] Failed to load query watermarks: {e}")
+            states = {}
+        return {q: states.get(query_id(q), {}) for q in queries}
+
+    async def _search_incremental(
+        self, query: str, state: dict, max_results: int
+    ) -> tuple[int, list[str], Optional[dict]]:
+        # returns (raw result count, ids never processed before, cursor to save)
+        # keep paging while a window keeps returning full pages; once it drains the
+        # watermark moves up to when that window was opened
+        page_token = state.get("page_token")
+        if page_token:
+            published_after = state.get("window_after")
+            window_started = state.get("window_started_at") or _rfc3339(datetime.now(timezone.utc))
+            pages = state.get("window_pages", 0)
+            # a page token is only valid with the same request it came from
+            max_results = state.get("window_max_results") or max_results
+        else:
+            published_after = state.get("published_after")
+            window_started = _rfc3339(datetime.now(timezone.utc))
+            pages = 0
+        try:
+            video_ids, next_token = await self.youtube_service.search_shorts_page(
+                query,
+                max_results=max_results,
+                published_after=published_after,
+                page_token=page_token,
+            )
+            found = len(video_ids)
+            video_ids = await self.seen_service.filter_unseen(video_ids)
+        except Exception as e:
+            print(f"[crawler] YouTube search failed for '{query}': {e}")
+            # drop the window: a stale page token would otherwise be retried (and billed)
+            # every run. the watermark stays where it was
+            return 0, [], {**_CLOSED_WINDOW, "last_error": str(e)[:200]}
+
+        pages += 1
+        if next_token and found >= min(max_results, 50) and pages < _MAX_PAGES_PER_WINDOW:
+            cursor = {
+                "page_token": next_token,
+                "window_after": published_after,
+                "window_started_at": window_started,
+                "window_pages": pages,
+                "window_max_results": max_results,
+                "last_error": None,
+            }
+        else:
+            cursor = {**_CLOSED_WINDOW, "published_after": window_started, "last_error": None}
+        return found, video_ids, cursor
+
+    async def _record_query_run(
+        self, query: str, state: dict, cursor: dict, found: int, new: int
+    ) -> None:
+        # failed searches count as dry, so a query that keeps erroring gets rested too
+        now = datetime.now(timezone.utc)
+        dry_streak = 0 if new else state.get("dry_streak", 0) + 1
+        skip_until = None
+        if dry_streak >= DRY_STREAK_LIMIT:
+            backoff = min(_DRY_BACKOFF_MAX, _DRY_BACKOFF_BASE * 2 ** (dry_streak - DRY_STREAK_LIMIT))
+            skip_until = now + backoff
+        try:
+            await self.firestore_service.save_crawl_query_state(query_id(query), {
+                **cursor,
+                "query": query,
+                "last_run_at": now,
+                "last_found": found,
+                "last_new": new,
+                "recent_yields": (state.get("recent_yields") or [])[-(_RECENT_YIELDS - 1):] + [new],
+                "dry_streak": dry_streak,
+                "skip_until": skip_until,
+                "runs": state.get("runs", 0) + 1,
+            })
+        except Exception as e:
+            print(f"[crawler] Failed to save watermark for '{query}': {e}")
+
     async def crawl_and_match(self, query: str | None = None, max_videos: int = 10) -> int:
-        await self.firestore_service.update_crawler_state("running")
+        if not query:
+            states = await self._load_query_states(SEARCH_QUERIES)
+            awake = [q for q in SEARCH_QUERIES if not is_resting(states[q])]
+            query = random.choice(awake or SEARCH_QUERIES)
+        print(f"[crawler] Searching YouTube for: '{query}'")
+        result = await self.crawl_run([query], max_videos, include_resting=True)
+        return result["videos_added"]
+
+    def _match_stages(
+        self, source: str, check_embeddable: bool, limiter: AdaptiveLimiter, added: list[str]
+    ) -> list[Stage]:
+        async def embed(batch: list[str]) -> list[str]:
+            if not check_embeddable:
+                return batch
+            embeddable = await self.youtube_service.batch_check_embeddable(batch)
+            kept = set(embeddable)
+            await self.seen_service.record({vid: NOT_EMBEDDABLE for vid in batch if vid not in kept})
+            return embeddable
+
+        async def prepare(batch: list[str]) -> list[tuple]:
+            prepared = await self.feed_service.prepare_videos(batch)
+            return [(vid, *prepared.get(vid, (None, None))) for vid in batch]
+
+        # a lookup that raised isn't a miss: it drops out here unrecorded and gets retried
+        # the next time a search turns it up
+        async def match(item: tuple) -> list[tuple]:
+            video_id, metadata, keywords = item
+            async with limiter.slot():
+                result = await self.feed_service.match_prepared(video_id, metadata, keywords)
+            return [(video_id, result)]
+
+        async def write(batch: list[tuple]) -> list[str]:
+            now = datetime.now(timezone.utc)
+            items = {
+                video_id: {
+                    "youtube": item["youtube"],
+                    "kalshi": item["kalshi"],
+                    "keywords": item.get("keywords", []),
+                    "channel": item["youtube"].get("channel", ""),
+                    "crawled_at": now,
+                    "source": source,
+                }
+                for video_id, item in batch if item
+            }
+            await self.seen_service.record({video_id: NO_MATCH for video_id, item in batch if not item})
+            if items:
+                await self.firestore_service.upsert_feed_items(items)
+                # only after the commit, or a failed write would skip these videos for good
+                await self.seen_service.record({video_id: ADDED for video_id in items})
+            added.extend(items)
+            return list(items)
+
+        return [
+            Stage("embed", embed, workers=2, batch_size=50, max_wait=0.5),
+            Stage("prepare", prepare, workers=4, batch_size=settings.CRAWL_BATCH_SIZE, max_wait=0.5),
+            Stage("match", match, workers=limiter.maximum, queue_size=2 * limiter.maximum),
+            Stage("write", write, workers=1, batch_size=100, max_wait=1.0),
+        ]
+
+    async def _match_and_store(self, video_ids: list[str], source: str) -> list[str]:
+        added: list[str] = []
+        limiter = AdaptiveLimiter(initial=4, maximum=settings.CRAWL_MATCH_WORKERS)
+        # explicit ids: prepare's metadata fetch already reports embeddability
+        pipeline = Pipeline(source, self._match_stages(source, False, limiter, added))
+        _pipelines[source] = pipeline
+        async with self.feed_service.batch_session():
+            await pipeline.run(video_ids)
+        return added
+
+    async def crawl_run(
+        self,
+        queries: list[str] | None = None,
+        max_videos_per_query: int = 50,
+        include_resting: bool = False,
+    ) -> dict:
+        with batch_priority():
+            return await self._crawl_run(
+                queries or SEARCH_QUERIES, max_videos_per_query, include_resting
+            )
+
+    async def _crawl_run(
+        self, queries: list[str], max_videos_per_query: int, include_resting: bool
+    ) -> dict:
+        started = time.monotonic()
+        queries = list(dict.fromkeys(q.strip() for q in queries if q.strip()))
+        states = await self._load_query_states(queries)
+        resting = [] if include_resting else [q for q in queries if is_resting(states[q])]
+        queries = [q for q in queries if q not in resting]
+        # spend the quota on the queries that have been producing the most lately
+        queries.sort(key=lambda q: -sum(states[q].get("recent_yields") or [1]))
+        allowed = await self.quota_service.plan_searches(len(queries))
+        deferred = queries[allowed:]
+        queries = queries[:allowed]
+        if not queries:
+            print(f"[crawl_run] Nothing to search ({len(deferred)} deferred for quota, {len(resting)} resting)")
+            await self.firestore_service.update_crawler_state("quota_deferred" if deferred else "idle", 0)
+            return {
+                "videos_added": 0, "queries": [], "deferred": deferred,
+                "resting": resting, "elapsed_s": 0.0,
+            }
+
+        run_started_at = datetime.now(timezone.utc)
+        await self.firestore_service.update_crawler_state("running", run_started_at=run_started_at)
         try:
-            search_query = query or random.choice(SEARCH_QUERIES)
-            print(f"[crawler] Searching YouTube for: '{search_query}'")
-
-            video_ids = await self.search_youtube_shorts(search_query, max_results=max_videos + 5)
-            if not video_ids:
-                await self.firestore_service.update_crawler_state("idle", 0)
-                return 0
-
-            existing_ids = set(await self.firestore_service.get_all_active_video_ids())
-            new_ids = [vid for vid in video_ids if vid not in existing_ids][:max_videos]
-            print(f"[crawler] Found {len(video_ids)} videos, {len(new_ids)} are new")
-
-            if not new_ids:
-                await self.firestore_service.update_crawler_state("idle", 0)
-                return 0
-
-            added = 0
-            batch_size = 5
-            for i in range(0, len(new_ids), batch_size):
-                batch = new_ids[i : i + batch_size]
-                results = await self.feed_service.get_feed(batch)
-                for item in results:
-                    video_id = item["youtube"]["video_id"]
-                    await self.firestore_service.upsert_feed_item(video_id, {
-                        "youtube": item["youtube"],
-                        "kalshi": item["kalshi"],
-                        "keywords": item.get("keywords", []),
-                        "channel": item["youtube"].get("channel", ""),
-                        "crawled_at": datetime.now(timezone.utc),
-                        "source": "crawler",
-                    })
-                    added += 1
-
-                if i + batch_size < len(new_ids):
-                    await asyncio.sleep(2)
-
-            await self.firestore_service.update_crawler_state("idle", added)
-            print(f"[crawler] Done. Added {added} videos to pool.")
-            return added
+            # a search costs 100 units regardless of page size; when quota is tight take a full
+            # page and rely on the search filter + metadata for embeddability instead of a check call
+            tight = await self.quota_service.is_tight()
+            per_query: dict[str, dict] = {
+                q: {"query": q, "found": 0, "new": 0, "added": 0} for q in queries
+            }
+            owner: dict[str, str] = {}
+
+            async def search(query: str) -> list[str]:
+                t0 = time.monotonic()
+                found, ids, cursor = await self._search_incremental(
+                    query, states[query], max_results=50 if tight else max_videos_per_query + 5
+                )
+                # first query to surface a video gets the credit for it
+                fresh = [vid for vid in ids if vid not in owner][:max_videos_per_query]
+                for vid in fresh:
+                    owner[vid] = query
+                per_query[query].update({
+                    "search_ms": round(1000 * (time.monotonic() - t0)),
+                    "found": found,
+                    "new": len(fresh),
+                    "incremental": bool(states[query].get("published_after")),
+                })
+                await self._record_query_run(query, states[query], cursor, found, len(fresh))
+                return fresh
+
+            added: list[str] = []
+            limiter = AdaptiveLimiter(initial=4, maximum=settings.CRAWL_MATCH_WORKERS)
+            pipeline = Pipeline("crawl_run", [
+                Stage("search", search, workers=min(len(queries), 8), queue_size=len(queries)),
+                *self._match_stages("crawler", not tight, limiter, added),
+            ])
+            _pipelines["crawl_run"] = pipeline
+            async with self.feed_service.batch_session():
+                await pipeline.run(queries)
+
+            for vid in added:
+                per_query[owner[vid]]["added"] += 1
+            for stats in per_query.values():
+                stats["yield"] = round(stats["added"] / stats["found"], 3) if stats["found"] else 0.0
+
+            elapsed = time.monotonic() - started
+            await self.firestore_service.update_crawler_state(
+                "idle", len(added),
+                run_started_at=run_started_at,
+                run_duration_s=round(elapsed, 1),
+                # stages overlap now, so these are each phase's own wall time, not a split of the run
+                search_duration_s=round(pipeline.span("search"), 1),
+                match_duration_s=round(pipeline.span("embed", "prepare", "match", "write"), 1),
+            )
+            print(
+                f"[crawl_run] Done. {len(queries)} queries, {len(owner)} unseen, added {len(added)} "
+                f"in {elapsed:.1f}s (limiter {limiter.stats()})"
+            )
+            return {
+                "videos_added": len(added),
+                "candidates": len(owner),
+                "queries": list(per_query.values()),
+                "deferred": deferred,
+                "resting": resting,
+                "elapsed_s": round(elapsed, 1),
+                "limiter": limiter.stats(),
+                "pipeline": pipeline.stats(),
+            }
 
         except Exception as e:
-            print(f"[crawler] Error: {e}")
+            print(f"[crawl_run] Error: {e}")
             await self.firestore_service.update_crawler_state("error", 0)
             raise
 
     async def seed_videos(self, video_ids: list[str]) -> int:
-        existing_ids = set(await self.firestore_service.get_all_active_video_ids())
-        new_ids = [vid for vid in video_ids if vid not in existing_ids]
+        with batch_priority():
+            return await self._seed_videos(video_ids)
+
+    async def _seed_videos(self, video_ids: list[str]) -> int:
+        # explicit ids skip the seen registry: an operator seeding a video (say one that was
+        # purged) wants it matched again, not reported as already processed
+        new_ids = list(dict.fromkeys(vid for vid in video_ids if vid))
         if not new_ids:
-            print(f"[seed] All {len(video_ids)} videos already in pool")
             return 0
 
-        results = await self.feed_service.get_feed(new_ids)
-        added = 0
-        for item in results:
-            video_id = item["youtube"]["video_id"]
-            await self.firestore_service.upsert_feed_item(video_id, {
-                "youtube": item["youtube"],
-                "kalshi": item["kalshi"],
-                "keywords": item.get("keywords", []),
-                "channel": item["youtube"].get("channel", ""),
-                "crawled_at": datetime.now(timezone.utc),
-                "source": "seed",
-            })
-            added += 1
-
+        added = len(await self._match_and_store(new_ids, "seed"))
         print(f"[seed] Added {added}/{len(video_ids)} videos to pool.")
         return added
 
@@ -3,11 +3,18 @@ import json
 import math
 import re
 import time
-from typing import Optional
-from openai import AsyncOpenAI
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from services.firestore_service import FirestoreService
 from services.kalshi_service import KalshiService
 from services.youtube_service import YoutubeService
+from utils.async_cache import AsyncTTLCache
+from utils.concurrency import concurrency
 from utils.env import settings
+from utils.llm_cache import parses_as_json
+from utils.llm_gateway import llm_gateway
+from utils.name_detector import update_gazetteer
 
 # cache
 _events_cache: list[dict] = []
@@ -15,12 +22,42 @@ _events_cache_ts: float = 0.0
 _EVENTS_CACHE_TTL: float = 300.0  # 5 minutes
 _events_cache_lock: asyncio.Lock | None = None
 
+# /shorts/match results by video id; prices are refreshed separately on a shorter TTL
+_match_cache = AsyncTTLCache(max_entries=1024, ttl=1800.0)
+_priced_match_cache = AsyncTTLCache(max_entries=1024, ttl=60.0)
+
+# trade advice is shared across taps on the same market/side at roughly the same price
+_advice_cache = AsyncTTLCache(max_entries=2048, ttl=120.0)
+_ADVICE_PRICE_BUCKET = 5
+
+# how each video's series/keywords were decided: local rules vs LLM extraction
+_keyword_path_counts = {"rules": 0, "llm": 0}
+
+_KEYWORD_BATCH_TOKEN_LIMIT = 3000
+_KEYWORD_BATCH_MAX_VIDEOS = 20
+
+_REPRICE_TICKERS_PER_CALL = 100
+_OPEN_MARKET_STATUSES = {"active", "open", "initialized"}
+
+
+def matching_stats() -> dict:
+    total = sum(_keyword_path_counts.values())
+    return {
+        **_keyword_path_counts,
+        "rules_share": round(_keyword_path_counts["rules"] / total, 3) if total else 0.0,
+    }
+
 
 class FeedService:
-    def __init__(self, youtube_service: YoutubeService, kalshi_service: KalshiService) -> None:
-        self.openai = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(
+        self,
+        youtube_service: YoutubeService,
+        kalshi_service: KalshiService,
+        firestore_service: FirestoreService,
+    ) -> None:
         self.youtube_service = youtube_service
         self.kalshi_service = kalshi_service
+        self.firestore_service = firestore_service
 
     async def _extract_keywords(self, title: str, description: str) -> list[str]:
         prompt = f"""Extract 3-5 keywords from this YouTube video that could match prediction market trades.
@@ -30,14 +67,106 @@ Return ONLY comma-separated keywords, no explanation.
 Title: {title}
 Description: {description[:500]}"""
 
-        response = await self.openai.chat.completions.create(
-            model="gpt-4o",
+        keywords_str = await llm_gateway.complete_tiered(
+            "keywords",
+            models=settings.LLM_KEYWORD_MODELS,
+            messages=[{"role": "user", "content": prompt}],
+            accept=self._looks_like_keywords,
+            temperature=0,
+            cache=True,
+            cache_if=self._looks_like_keywords,
+        )
+        return self._parse_keywords(keywords_str)
+
+    async def _extract_keywords_batch(
+        self, videos: list[tuple[str, str, str]]
+    ) -> dict[str, list[str]]:
+        chunks: list[list[tuple[str, str, str]]] = []
+        chunk_tokens = 0
+        for video in videos:
+            video_id, title, description = video
+            tokens = (len(title) + len(description[:500])) // 4 + 20
+            if not chunks or chunk_tokens + tokens > _KEYWORD_BATCH_TOKEN_LIMIT or len(chunks[-1]) >= _KEYWORD_BATCH_MAX_VIDEOS:
+                chunks.append([])
+                chunk_tokens = 0
+            chunks[-1].append(video)
+            chunk_tokens += tokens
+
+        results: dict[str, list[str]] = {}
+        for chunk_result in await asyncio.gather(
+            *[self._extract_keywords_chunk(chunk) for chunk in chunks], return_exceptions=True
+        ):
+            if isinstance(chunk_result, Exception):
+                print(f"[keywords] Batch extraction failed: {chunk_result}", flush=True)
+                continue
+            results.update(chunk_result)
+
+        missing = [v for v in videos if v[0] not in results]
+        if missing:
+            print(f"[keywords] Batch missed {len(missing)}/{len(videos)} videos, falling back to single calls", flush=True)
+            singles = await asyncio.gather(
+                *[self._extract_keywords(title, description) for _, title, description in missing],
+                return_exceptions=True,
+            )
+            for (video_id, _, _), keywords in zip(missing, singles):
+                if isinstance(keywords, Exception):
+                    print(f"[{video_id}] Keyword extraction failed: {keywords}", flush=True)
+                    continue
+                results[video_id] = keywords
+        return results
+
+    async def _extract_keywords_chunk(
+        self, videos: list[tuple[str, str, str]]
+    ) -> dict[str, list[str]]:
+        entries = "\n\n".join(
+            f"ID: {video_id}\nTitle: {title}\nDescription: {description[:500]}"
+            for video_id, title, description in videos
+        )
+        prompt = f"""Extract 3-5 keywords from each YouTube video below that could match prediction market trades.
+Focus on: sports teams/players, political figures, companies, events, weather phenomena, cryptocurrency.
+Return JSON only: {{"videos": [{{"id": "<ID>", "keywords": ["...", "..."]}}]}} with one entry per video ID.
+
+{entries}"""
+        expected = {video_id for video_id, _, _ in videos}
+
+        def parse(content: str) -> dict[str, list[str]]:
+            try:
+                data = json.loads(content)
+            except (TypeError, ValueError):
+                return {}
+            parsed: dict[str, list[str]] = {}
+            for entry in data.get("videos", []) if isinstance(data, dict) else []:
+                video_id = entry.get("id") if isinstance(entry, dict) else None
+                keywords = entry.get("keywords") if isinstance(entry, dict) else None
+                if video_id not in expected or not isinstance(keywords, list):
+                    continue
+                cleaned = [str(k).strip() for k in keywords if str(k).strip()]
+                if self._looks_like_keywords(", ".join(cleaned)):
+                    parsed[video_id] = cleaned
+            return parsed
+
+        content = await llm_gateway.complete_tiered(
+            "keywords_batch",
+            models=settings.LLM_KEYWORD_MODELS,
             messages=[{"role": "user", "content": prompt}],
+            accept=lambda c: len(parse(c)) == len(expected),
             temperature=0,
+            max_tokens=40 * len(videos) + 50,
+            response_format={"type": "json_object"},
+            cache=True,
+            cache_if=parses_as_json,
         )
-        keywords_str = response.choices[0].message.content.strip()
+        return parse(content)
+
+    @staticmethod
+    def _parse_keywords(keywords_str: str) -> list[str]:
         return [k.strip() for k in keywords_str.split(",") if k.strip()]
 
+    @classmethod
+    def _looks_like_keywords(cls, keywords_str: str) -> bool:
+        keywords = cls._parse_keywords(keywords_str)
+        return 1 <= len(keywords) <= 8 and all(len(k) <= 40 for k in keywords)
+
     async def _format_market_display(
         self, market: dict, event: dict, keywords: list[str]
     ) -> dict:
@@ -60,12 +189,14 @@ Create a clean, user-friendly trade display:
 Return JSON only: {{"question": "...", "outcome": "..."}}"""
 
         try:
-            response = await self.openai.chat.completions.create(
+            content = await llm_gateway.complete(
+                "market_display",
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0,
+                cache=True,
+                cache_if=parses_as_json,
             )
-            content = response.choices[0].message.content.strip()
             if content.startswith("```"):
                 content = content.split("```")[1]
                 if content.startswith("json"):
@@ -169,6 +300,11 @@ Return JSON only: {{"question": "...", "outcome": "..."}}"""
                 return _events_cache
             print("[cache] Refreshing Kalshi events cache...")
             events = await self.kalshi_service.get_all_events()
+            added = update_gazetteer(
+                [e.get("title", "") for e in events],
+                [m.get("yes_sub_title", "") for e in events for m in e.get("markets", [])],
+            )
+            print(f"[cache] Name gazetteer +{added} entries")
             _events_cache = events
             _events_cache_ts = time.monotonic()
             print(f"[cache] Cached {len(events)} open events")
@@ -201,13 +337,15 @@ Respond with ONLY the number of the best matching event (e.g., "42"). No explana
 {event_list_str}"""
 
         try:
-            response = await self.openai.chat.completions.create(
+            answer = await llm_gateway.complete(
+                "event_match",
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0,
                 max_tokens=10,
+                cache=True,
+                cache_if=lambda c: re.search(r"\d+", c) is not None,
             )
-            answer = response.choices[0].message.content.strip()
             match = re.search(r"\d+", answer)
             if not match:
                 return None
@@ -217,7 +355,7 @@ Respond with ONLY the number of the best matching event (e.g., "42"). No explana
             return events[idx]
         except Exception as e:
             print(f"[openai] Event matching failed: {e}")
-            return None
+            raise
 
     @staticmethod
     def _generate_synthetic_history(
@@ -245,26 +383,156 @@ Respond with ONLY the number of the best matching event (e.g., "42"). No explana
         return [m for m in markets if m.get("status") == "open"]
 
     async def match_video(self, video_id: str) -> Optional[dict]:
-        await self.kalshi_service.ensure_session()
+        matched = await _match_cache.get_or_compute(
+            video_id,
+            lambda: self._with_kalshi_session(lambda: self._lookup_or_match(video_id)),
+            cache_if=lambda result: result is not None,
+        )
+        if not matched:
+            return None
+        return await _priced_match_cache.get_or_compute(
+            video_id, lambda: self._with_kalshi_session(lambda: self._refresh_prices(matched))
+        )
+
+    # coalesced computes are shielded and outlive the caller that started them, so each one
+    # holds the session itself; a cancelled first caller can't close it under the others
+    async def _with_kalshi_session(self, compute):
+        await self.kalshi_service.acquire_session()
+        try:
+            return await compute()
+        finally:
+            await self.kalshi_service.release_session()
+
+    async def _lookup_or_match(self, video_id: str) -> Optional[dict]:
+        try:
+            pooled = await self.firestore_service.get_active_feed_item(video_id)
+        except Exception as e:
+            print(f"[{video_id}] Pool lookup failed: {e}")
+            pooled = None
+        if pooled and pooled.get("kalshi"):
+            print(f"[{video_id}] Served from feed_pool")
+            return {
+                "youtube": pooled.get("youtube", {}),
+                "kalshi": pooled.get("kalshi", []),
+                "keywords": pooled.get("keywords", []),
+            }
+        return await self._match_video_bounded(video_id)
+
+    async def _refresh_prices(self, matched: dict) -> dict:
+        markets = matched.get("kalshi", [])
+        tickers = [m.get("ticker", "") for m in markets if m.get("ticker")]
+        try:
+            latest = await self.kalshi_service.get_markets_by_tickers(tickers)
+        except Exception as e:
+            print(f"[prices] Refresh failed for {len(tickers)} markets: {e}")
+            return matched
+        by_ticker = {m.get("ticker", ""): m for m in latest}
+        return {**matched, "kalshi": self._apply_prices(markets, by_ticker)}
+
+    def _apply_prices(self, markets: list[dict], by_ticker: dict[str, dict]) -> list[dict]:
+        refreshed = []
+        for market in markets:
+            current = by_ticker.get(market.get("ticker", ""))
+            if not current:
+                refreshed.append(market)
+                continue
+            yes_price = self.kalshi_service.to_cents(
+                current.get("yes_bid"), current.get("yes_bid_dollars")
+            )
+            no_price = self.kalshi_service.to_cents(
+                current.get("no_bid"), current.get("no_bid_dollars")
+            )
+            refreshed.append({
+                **market,
+                "yes_price": round(yes_price if yes_price is not None else market.get("yes_price", 0), 2),
+                "no_price": round(no_price if no_price is not None else market.get("no_price", 0), 2),
+                "volume": current.get("volume", market.get("volume", 0)),
+            })
+        return refreshed
+
+    async def reprice_pool(self, max_items: int = 1000) -> dict:
+        # stalest first; one kalshi call per 100 tickers instead of one per item
+        items = await self.firestore_service.list_active_feed_markets()
+        items.sort(key=lambda item: item.get("priced_at") or datetime.min.replace(tzinfo=timezone.utc))
+        items = items[:max_items]
+        tickers = list(dict.fromkeys(
+            m.get("ticker", "") for item in items for m in item.get("kalshi", []) if m.get("ticker")
+        ))
+        await self.kalshi_service.acquire_session()
         try:
-            return await self._match_video_inner(video_id)
+            chunks = await asyncio.gather(*[
+                self.kalshi_service.get_markets_by_tickers(tickers[i : i + _REPRICE_TICKERS_PER_CALL])
+                for i in range(0, len(tickers), _REPRICE_TICKERS_PER_CALL)
+            ], return_exceptions=True)
         finally:
-            await self.kalshi_service.close_session()
+            await self.kalshi_service.release_session()
+        by_ticker: dict[str, dict] = {}
+        for chunk in chunks:
+            if isinstance(chunk, Exception):
+                print(f"[reprice] Market fetch failed: {chunk}")
+                continue
+            by_ticker.update({m.get("ticker", ""): m for m in chunk})
+
+        updates: dict[str, list[dict]] = {}
+        closed: list[str] = []
+        for item in items:
+            markets = item.get("kalshi", [])
+            latest = [by_ticker.get(m.get("ticker", "")) for m in markets]
+            if latest and all(m and m.get("status") not in _OPEN_MARKET_STATUSES for m in latest):
+                closed.append(item["video_id"])
+                continue
+            updates[item["video_id"]] = self._apply_prices(markets, by_ticker)
+        await self.firestore_service.update_feed_item_prices(updates, deactivate=closed)
+        print(f"[reprice] {len(updates)} items repriced from {len(by_ticker)}/{len(tickers)} markets, {len(closed)} deactivated (markets closed)")
+        return {"repriced": len(updates), "deactivated": len(closed), "markets": len(by_ticker)}
+
+    async def _match_video_bounded(
+        self,
+        video_id: str,
+        metadata: Optional[dict] = None,
+        keywords: Optional[list[str]] = None,
+        strict: bool = False,
+    ) -> Optional[dict]:
+        async with concurrency.slot("video", upstream=False):
+            return await self._match_video_inner(video_id, metadata, keywords, strict)
 
-    async def _match_video_inner(self, video_id: str) -> Optional[dict]:
+    # strict: lookups that failed raise instead of reading as "no match", for callers
+    # (the crawler) that remember misses
+    async def _match_video_inner(
+        self,
+        video_id: str,
+        metadata: Optional[dict] = None,
+        keywords: Optional[list[str]] = None,
+        strict: bool = False,
+    ) -> Optional[dict]:
         await self.kalshi_service.ensure_session()
         print(f"[{video_id}] Starting match...")
-        metadata = await self.youtube_service.get_video_metadata(video_id)
+        if metadata is None:
+            metadata = await self.youtube_service.get_video_metadata(video_id)
         print(f"[{video_id}] Title: {metadata.get('title', 'No title')}")
-
-        keywords = await self._extract_keywords(metadata["title"], metadata["description"])
-        print(f"[{video_id}] Keywords: {keywords}")
-
-        if not keywords:
-            print(f"[{video_id}] FAILED: No keywords extracted")
+        if not metadata.get("embeddable", True):
+            print(f"[{video_id}] SKIPPED: not embeddable or unavailable")
             return None
 
-        series = self.kalshi_service.detect_series_from_keywords(keywords)
+        rule_match = self.kalshi_service.detect_series_from_metadata(
+            metadata["title"], metadata.get("tags", []), metadata.get("category_id", "")
+        )
+        if rule_match:
+            series, matched_terms = rule_match
+            keywords = list(dict.fromkeys(matched_terms + metadata.get("tags", [])[:4]))
+            _keyword_path_counts["rules"] += 1
+            print(f"[{video_id}] Rule match: {series} via {matched_terms} (skipping LLM)")
+        else:
+            if keywords is None:
+                keywords = await self._extract_keywords(metadata["title"], metadata["description"])
+            _keyword_path_counts["llm"] += 1
+            print(f"[{video_id}] Keywords: {keywords}")
+
+            if not keywords:
+                print(f"[{video_id}] FAILED: No keywords extracted")
+                return None
+
+            series = self.kalshi_service.detect_series_from_keywords(keywords)
         best_event = {}
 
         if series:
@@ -302,6 +570,8 @@ Respond with ONLY the number of the best matching event (e.g., "42"). No explana
             all_events = await self._get_cached_events()
             if not all_events:
                 print(f"[{video_id}] SKIPPED: no events available for fallback")
+                if strict:
+                    raise RuntimeError("no Kalshi events available")
                 return None
 
             matched_event = await self._match_event_via_openai(keywords, all_events)
@@ -345,12 +615,60 @@ Respond with ONLY the number of the best matching event (e.g., "42"). No explana
             }
         except Exception as e:
             print(f"[{video_id}] FAILED (semantic fallback): {e}")
+            if strict:
+                raise
             return None
 
-    async def get_feed(self, video_ids: list[str]) -> list[dict]:
-        await self.kalshi_service.ensure_session()
+    async def _prepare_feed(
+        self, video_ids: list[str], batch_keywords: bool
+    ) -> dict[str, tuple[dict, Optional[list[str]]]]:
+        try:
+            metadata = await self.youtube_service.get_videos_metadata(video_ids)
+        except Exception as e:
+            # each video will fetch its own metadata instead
+            print(f"[feed] Bulk metadata fetch failed: {e}", flush=True)
+            return {}
+        if not batch_keywords:
+            return {vid: (m, None) for vid, m in metadata.items()}
+        needs_llm = [
+            (vid, m["title"], m["description"])
+            for vid, m in metadata.items()
+            if m.get("title")
+            and not self.kalshi_service.detect_series_from_metadata(
+                m["title"], m.get("tags", []), m.get("category_id", "")
+            )
+        ]
+        keywords = await self._extract_keywords_batch(needs_llm) if needs_llm else {}
+        print(f"[bulk] {len(metadata)}/{len(video_ids)} metadata, {len(keywords)}/{len(needs_llm)} batched keyword sets", flush=True)
+        return {vid: (m, keywords.get(vid)) for vid, m in metadata.items()}
+
+    # pipeline entry points: hydrate a batch up front, then match videos one at a time
+    @asynccontextmanager
+    async def batch_session(self) -> AsyncIterator[None]:
+        await self.kalshi_service.acquire_session()
         try:
-            tasks = [self._match_video_inner(vid) for vid in video_ids]
+            yield
+        finally:
+            await self.kalshi_service.release_session()
+
+    async def prepare_videos(
+        self, video_ids: list[str]
+    ) -> dict[str, tuple[dict, Optional[list[str]]]]:
+        return await self._prepare_feed(video_ids, batch_keywords=True)
+
+    async def match_prepared(
+        self, video_id: str, metadata: Optional[dict], keywords: Optional[list[str]]
+    ) -> Optional[dict]:
+        return await self._match_video_bounded(video_id, metadata, keywords, strict=True)
+
+    async def get_feed(self, video_ids: list[str], bulk: bool = False) -> list[dict]:
+        await self.kalshi_service.acquire_session()
+        try:
+            prepared = await self._prepare_feed(video_ids, batch_keywords=bulk)
+            tasks = [
+                self._match_video_bounded(vid, *prepared.get(vid, (None, None)))
+                for vid in video_ids
+            ]
             results = await asyncio.gather(*tasks, return_exceptions=True)
             feed = []
             for vid, result in zip(video_ids, results):
@@ -360,18 +678,42 @@ Respond with ONLY the number of the best matching event (e.g., "42"). No explana
                     feed.append(result)
             return feed
         finally:
-            await self.kalshi_service.close_session()
+            await self.kalshi_service.release_session()
 
-    async def get_trade_advice(
-        self,
-        question: str,
-        side: str,
-        amount: float,
-        yes_price: float,
-        no_price: float,
-    ) -> str:
-        price = yes_price if side.upper() == "YES" else no_price
-        prompt = f"""You are Joe, a friendly and slightly sarcastic trading advisor. Keep it very brief.
+    async def stream_feed(
+        self, video_ids: list[str], item_timeout: Optional[float] = None
+    ) -> AsyncIterator[dict]:
+        await self.kalshi_service.acquire_session()
+
+        async def match_with_deadline(vid: str) -> Optional[dict]:
+            if not item_timeout:
+                return await self._match_video_bounded(vid)
+            try:
+                return await asyncio.wait_for(self._match_video_bounded(vid), item_timeout)
+            except asyncio.TimeoutError:
+                print(f"[{vid}] SKIPPED: no result within {item_timeout}s", flush=True)
+                return None
+
+        tasks = {asyncio.ensure_future(match_with_deadline(vid)): vid for vid in video_ids}
+        try:
+            for next_done in asyncio.as_completed(list(tasks)):
+                try:
+                    result = await next_done
+                except Exception as e:
+                    print(f"[stream] FAILED: {e}", flush=True)
+                    continue
+                if result:
+                    yield result
+        finally:
+            # client went away or we finished; drop anything still running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.kalshi_service.release_session()
+
+    @staticmethod
+    def _advice_prompt(question: str, side: str, amount: float, price: float) -> str:
+        return f"""You are Joe, a friendly and slightly sarcastic trading advisor. Keep it very brief.
 
 Format: One short sentence (max 15 words), then exactly 3 bullet points (each max 10 words). Use this exact format:
 <sentence>
@@ -386,16 +728,86 @@ Current odds: {side} at {price}¢
 
 Give your quick take on this trade. Be casual and fun."""
 
+    @staticmethod
+    def _advice_cache_key(question: str, side: str, amount: float, price: float) -> tuple:
+        try:
+            price_bucket = int(float(price) // _ADVICE_PRICE_BUCKET)
+        except (TypeError, ValueError):
+            price_bucket = -1
         try:
-            response = await self.openai.chat.completions.create(
+            amount_value = float(amount)
+        except (TypeError, ValueError):
+            amount_value = 0.0
+        # $1, $2-3, $4-7, $8-15, ... share advice
+        amount_bucket = int(math.log2(amount_value)) if amount_value >= 1 else 0
+        return (" ".join(question.lower().split()), side.upper(), price_bucket, amount_bucket)
+
+    @staticmethod
+    def _advice_fallback(side: str, amount: float) -> str:
+        return f"Hmm, I'm having trouble thinking right now... but ${amount} on {side}? Just make sure you're okay losing it!"
+
+    async def get_trade_advice(
+        self,
+        question: str,
+        side: str,
+        amount: float,
+        yes_price: float,
+        no_price: float,
+    ) -> str:
+        price = yes_price if side.upper() == "YES" else no_price
+        prompt = self._advice_prompt(question, side, amount, price)
+
+        try:
+            return await _advice_cache.get_or_compute(
+                self._advice_cache_key(question, side, amount, price),
+                lambda: llm_gateway.complete(
+                    "advice",
+                    model="gpt-4o-mini",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.8,
+                    max_tokens=200,
+                ),
+                cache_if=bool,
+            )
+        except Exception as e:
+            return self._advice_fallback(side, amount)
+
+    async def stream_trade_advice(
+        self,
+        question: str,
+        side: str,
+        amount: float,
+        yes_price: float,
+        no_price: float,
+    ) -> AsyncIterator[str]:
+        price = yes_price if side.upper() == "YES" else no_price
+        key = self._advice_cache_key(question, side, amount, price)
+        cached = _advice_cache.get(key)
+        if cached:
+            yield cached
+            return
+
+        prompt = self._advice_prompt(question, side, amount, price)
+        parts: list[str] = []
+        try:
+            async for delta in llm_gateway.stream(
+                "advice",
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.8,
                 max_tokens=200,
-            )
-            return response.choices[0].message.content.strip()
+            ):
+                parts.append(delta)
+                yield delta
         except Exception as e:
-            return f"Hmm, I'm having trouble thinking right now... but ${amount} on {side}? Just make sure you're okay losing it!"
+            print(f"[advice] Streaming failed: {e}", flush=True)
+            if not parts:
+                yield self._advice_fallback(side, amount)
+            return
+
+        advice = "".join(parts).strip()
+        if advice:
+            _advice_cache.set(key, advice)
 
     async def get_candlesticks(
         self,
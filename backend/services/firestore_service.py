@@ -3,8 +3,9 @@ from datetime import datetime, timezone, timedelta
 from typing import Optional
 import firebase_admin
 from firebase_admin import credentials, firestore_async
-from google.cloud.firestore_v1 import AsyncClient
+from google.cloud.firestore_v1 import AsyncClient, Increment
 from google.cloud.firestore_v1 import query as firestore_query
+from google.cloud.firestore_v1.async_transaction import async_transactional
 
 
 class FirestoreService:
@@ -69,10 +70,27 @@ class FirestoreService:
         items.sort(key=lambda d: order.get(d.get("_doc_id", ""), len(sampled)))
         return items
 
+    async def get_active_feed_item(self, video_id: str) -> Optional[dict]:
+        doc = await self.db.collection("feed_pool").document(video_id).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict() or {}
+        if not data.get("active", False):
+            return None
+        return data
+
     async def upsert_feed_item(self, video_id: str, data: dict) -> None:
         ref = self.db.collection("feed_pool").document(video_id)
         await ref.set({**data, "active": True}, merge=True)
 
+    async def upsert_feed_items(self, items: dict[str, dict]) -> None:
+        entries = list(items.items())
+        for i in range(0, len(entries), 500):
+            batch = self.db.batch()
+            for video_id, data in entries[i : i + 500]:
+                batch.set(self.db.collection("feed_pool").document(video_id), {**data, "active": True}, merge=True)
+            await batch.commit()
+
     async def deactivate_stale_items(self, max_age_hours: int = 24) -> int:
         cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
         query = (
@@ -97,24 +115,33 @@ class FirestoreService:
         return count
 
     async def purge_all_items(self) -> int:
+        # seen_video_service builds on this module, so its constants come in at call time
+        from services.seen_video_service import PURGED
+
         docs = await self.db.collection("feed_pool").select([]).get()
         count = 0
         for doc in docs:
             await doc.reference.delete()
             count += 1
+        await self.record_seen_videos({doc.id: PURGED for doc in docs})
         return count
 
     async def deactivate_by_keywords(self, match_keywords: list[str]) -> int:
+        from services.seen_video_service import PURGED
+
         match_lower = {k.lower() for k in match_keywords}
         query = self.db.collection("feed_pool").where("active", "==", True)
         docs = await query.get()
         count = 0
+        purged: dict[str, str] = {}
         for doc in docs:
             data = doc.to_dict() or {}
             item_keywords = [k.lower() for k in data.get("keywords", [])]
             if any(k in match_lower for k in item_keywords):
                 await doc.reference.update({"active": False})
+                purged[doc.id] = PURGED
                 count += 1
+        await self.record_seen_videos(purged)
         return count
 
     async def deactivate_feed_item(self, video_id: str) -> bool:
@@ -125,6 +152,23 @@ class FirestoreService:
         await ref.update({"active": False})
         return True
 
+    async def list_active_feed_markets(self) -> list[dict]:
+        query = self.db.collection("feed_pool").where("active", "==", True).select(["kalshi", "priced_at"])
+        docs = await query.get()
+        return [{"video_id": doc.id, **(doc.to_dict() or {})} for doc in docs]
+
+    async def update_feed_item_prices(
+        self, updates: dict[str, list[dict]], deactivate: Optional[list[str]] = None
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        writes = [(vid, {"kalshi": markets, "priced_at": now}) for vid, markets in updates.items()]
+        writes += [(vid, {"active": False, "priced_at": now}) for vid in deactivate or []]
+        for i in range(0, len(writes), 500):
+            batch = self.db.batch()
+            for video_id, data in writes[i : i + 500]:
+                batch.update(self.db.collection("feed_pool").document(video_id), data)
+            await batch.commit()
+
     async def get_all_active_video_ids(self) -> list[str]:
         query = self.db.collection("feed_pool").where("active", "==", True).select([])
         docs = await query.get()
@@ -157,19 +201,169 @@ class FirestoreService:
 
     # ── crawler_state ──
 
-    async def update_crawler_state(self, status: str, videos_added: int = 0) -> None:
+    async def update_crawler_state(self, status: str, videos_added: int = 0, **extra) -> None:
         ref = self.db.collection("crawler_state").document("latest")
         await ref.set({
             "last_run_at": datetime.now(timezone.utc),
             "videos_added": videos_added,
             "status": status,
+            **extra,
         })
 
+    async def record_job_run(self, job: str, data: dict) -> None:
+        ref = self.db.collection("crawler_state").document("scheduler")
+        await ref.set({job: data}, merge=True)
+
+    async def get_job_runs(self) -> dict:
+        doc = await self.db.collection("crawler_state").document("scheduler").get()
+        return doc.to_dict() if doc.exists else {}
+
+    # ── scheduler_leases ──
+
+    async def try_acquire_lease(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        ref = self.db.collection("scheduler_leases").document(name)
+
+        @async_transactional
+        async def claim(transaction) -> bool:
+            snapshot = await ref.get(transaction=transaction)
+            now = datetime.now(timezone.utc)
+            current = snapshot.to_dict() if snapshot.exists else None
+            if current and current.get("holder") != holder and current.get("expires_at") and current["expires_at"] > now:
+                return False
+            transaction.set(ref, {
+                "holder": holder,
+                "acquired_at": current.get("acquired_at", now) if current and current.get("holder") == holder else now,
+                "expires_at": now + timedelta(seconds=ttl_seconds),
+            })
+            return True
+
+        return await claim(self.db.transaction())
+
+    async def release_lease(self, name: str, holder: str) -> None:
+        ref = self.db.collection("scheduler_leases").document(name)
+        doc = await ref.get()
+        if doc.exists and (doc.to_dict() or {}).get("holder") == holder:
+            await ref.delete()
+
     async def get_crawler_state(self) -> Optional[dict]:
         ref = self.db.collection("crawler_state").document("latest")
         doc = await ref.get()
         return doc.to_dict() if doc.exists else None
 
+    # ── youtube_quota ──
+
+    async def get_youtube_quota(self, day: str) -> Optional[dict]:
+        doc = await self.db.collection("youtube_quota").document(day).get()
+        return doc.to_dict() if doc.exists else None
+
+    async def add_youtube_quota(self, day: str, endpoint: str, units: int) -> None:
+        ref = self.db.collection("youtube_quota").document(day)
+        await ref.set({
+            "day": day,
+            "used": Increment(units),
+            "by_endpoint": {endpoint: Increment(units)},
+            "updated_at": datetime.now(timezone.utc),
+        }, merge=True)
+
+    # ── seen_videos ──
+
+    async def get_seen_videos(self, video_ids: list[str]) -> dict[str, dict]:
+        refs = [self.db.collection("seen_videos").document(vid) for vid in video_ids]
+        seen: dict[str, dict] = {}
+        async for doc in self.db.get_all(refs):
+            if doc.exists:
+                seen[doc.id] = doc.to_dict()
+        return seen
+
+    async def record_seen_videos(self, outcomes: dict[str, str]) -> None:
+        now = datetime.now(timezone.utc)
+        items = list(outcomes.items())
+        # firestore caps a write batch at 500 operations
+        for i in range(0, len(items), 500):
+            batch = self.db.batch()
+            for video_id, outcome in items[i : i + 500]:
+                ref = self.db.collection("seen_videos").document(video_id)
+                batch.set(ref, {"outcome": outcome, "seen_at": now}, merge=True)
+            await batch.commit()
+
+    async def list_seen_video_ids(self) -> list[str]:
+        docs = await self.db.collection("seen_videos").select([]).get()
+        return [doc.id for doc in docs]
+
+    async def list_feed_video_ids(self) -> list[str]:
+        docs = await self.db.collection("feed_pool").select([]).get()
+        return [doc.id for doc in docs]
+
+    async def get_seen_checkpoint(self) -> Optional[dict]:
+        doc = await self.db.collection("seen_registry").document("bloom").get()
+        return doc.to_dict() if doc.exists else None
+
+    async def save_seen_checkpoint(self, data: dict) -> None:
+        await self.db.collection("seen_registry").document("bloom").set(
+            {**data, "updated_at": datetime.now(timezone.utc)}
+        )
+
+    # ── crawl_queries ──
+
+    async def get_crawl_query_states(self, query_ids: list[str]) -> dict[str, dict]:
+        refs = [self.db.collection("crawl_queries").document(qid) for qid in query_ids]
+        states: dict[str, dict] = {}
+        async for doc in self.db.get_all(refs):
+            if doc.exists:
+                states[doc.id] = doc.to_dict()
+        return states
+
+    async def save_crawl_query_state(self, query_id: str, data: dict) -> None:
+        await self.db.collection("crawl_queries").document(query_id).set(data, merge=True)
+
+    async def list_crawl_query_states(self) -> list[dict]:
+        docs = await self.db.collection("crawl_queries").get()
+        return [doc.to_dict() for doc in docs]
+
+    # ── render_index ──
+
+    async def get_render(self, key: str) -> Optional[dict]:
+        doc = await self.db.collection("render_index").document(key).get()
+        return doc.to_dict() if doc.exists else None
+
+    # returns the existing entry if it's done or still being rendered, otherwise claims it
+    async def claim_render(self, key: str, job_id: str, stale_after_seconds: float, max_age_hours: float) -> Optional[dict]:
+        ref = self.db.collection("render_index").document(key)
+
+        @async_transactional
+        async def claim(transaction) -> Optional[dict]:
+            snapshot = await ref.get(transaction=transaction)
+            now = datetime.now(timezone.utc)
+            current = snapshot.to_dict() if snapshot.exists else None
+            if current and current.get("status") == "done":
+                if current.get("completed_at") and now - current["completed_at"] < timedelta(hours=max_age_hours):
+                    return current
+            elif current and current.get("job_id") != job_id and current.get("claimed_at"):
+                if now - current["claimed_at"] < timedelta(seconds=stale_after_seconds):
+                    return current
+            transaction.set(ref, {"key": key, "status": "rendering", "job_id": job_id, "claimed_at": now})
+            return None
+
+        return await claim(self.db.transaction())
+
+    async def complete_render(self, key: str, data: dict) -> None:
+        await self.db.collection("render_index").document(key).set({
+            **data,
+            "key": key,
+            "status": "done",
+            "completed_at": datetime.now(timezone.utc),
+        })
+
+    async def release_render(self, key: str, job_id: str) -> None:
+        ref = self.db.collection("render_index").document(key)
+        doc = await ref.get()
+        current = doc.to_dict() if doc.exists else None
+        if current and current.get("status") == "rendering" and current.get("job_id") == job_id:
+            await ref.delete()
+
+    async def count_render_reuse(self, key: str) -> None:
+        await self.db.collection("render_index").document(key).update({"reused": Increment(1)})
+
     async def get_pool_stats(self) -> dict:
         active_ids = await self.get_all_active_video_ids()
         crawler_state = await self.get_crawler_state()
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from google.api_core.exceptions import NotFound
+from google.cloud import storage
+from services.vertex_service import IMAGEN_MODEL, VertexService
+from utils.env import settings
+from utils.image_ingest import image_mime_type, normalize_frame
+
+logger = logging.getLogger("frame_cache")
+_PREFIX = "frames/"
+
+
+def frame_key(prompt: str, model: str = IMAGEN_MODEL) -> str:
+    return hashlib.sha256(f"{model}\n{prompt}".encode()).hexdigest()
+
+
+# normalized imagen starting frames stored in gcs under a hash of (model, prompt). the
+# index of what's in the bucket is listed once, so a miss goes straight to imagen without
+# a gcs round trip; recently used frames are also kept in memory
+class FrameCacheService:
+    def __init__(self, vertex_service: VertexService) -> None:
+        self.vertex_service = vertex_service
+        self.max_age = timedelta(days=settings.FRAME_CACHE_MAX_AGE_DAYS)
+        self.max_entries = settings.FRAME_CACHE_MAX_ENTRIES
+        self.memory_limit = settings.FRAME_CACHE_MEMORY_MB * 1024 * 1024
+        self._index: dict[str, datetime] = {}
+        self._indexed = False
+        self._index_lock = asyncio.Lock()
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.memory_hits = 0
+        self.gcs_hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evicted = 0
+        self.saved_seconds = 0.0
+        self._generate_seconds: list[float] = []
+
+        self.bucket = None
+        if settings.GOOGLE_CLOUD_BUCKET_NAME:
+            try:
+                client = storage.Client(project=settings.GOOGLE_CLOUD_PROJECT or None)
+                self.bucket = client.bucket(settings.GOOGLE_CLOUD_BUCKET_NAME)
+            except Exception as exc:
+                logger.error(f"Frame cache running memory-only, GCS unavailable: {exc}")
+
+    def _list_sync(self) -> list[tuple[str, datetime]]:
+        return [
+            (blob.name[len(_PREFIX):].split(".")[0], blob.updated or datetime.now(timezone.utc))
+            for blob in self.bucket.list_blobs(prefix=_PREFIX)
+        ]
+
+    async def _ensure_index(self) -> None:
+        if self._indexed or not self.bucket:
+            return
+        async with self._index_lock:
+            if self._indexed:
+                return
+            try:
+                started = time.monotonic()
+                for key, updated in await asyncio.to_thread(self._list_sync):
+                    self._index[key] = updated
+                print(f"[frame-cache] Indexed {len(self._index)} frames in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                # without an index every lookup is a miss; frames still get stored
+                print(f"[frame-cache] Failed to list cached frames: {e}")
+            self._indexed = True
+
+    def _remember(self, key: str, image: bytes) -> None:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = image
+        self._memory_bytes += len(image)
+        while self._memory_bytes > self.memory_limit and len(self._memory) > 1:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_bytes -= len(dropped)
+
+    def _download_sync(self, key: str) -> Optional[bytes]:
+        try:
+            return self.bucket.blob(f"{_PREFIX}{key}.jpg").download_as_bytes()
+        except NotFound:
+            return None
+
+    def _upload_sync(self, key: str, image: bytes) -> None:
+        self.bucket.blob(f"{_PREFIX}{key}.jpg").upload_from_string(image, content_type=image_mime_type(image))
+
+    async def get_or_generate(self, prompt: str) -> Optional[bytes]:
+        key = frame_key(prompt)
+        if key in self._memory:
+            self.memory_hits += 1
+            self._memory.move_to_end(key)
+            self.saved_seconds += self._typical_generate_seconds()
+            return self._memory[key]
+
+        # identical prompts arriving together share one imagen call
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.shared += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            image = await self._load_or_generate(key, prompt)
+            future.set_result(image)
+            return image
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # nobody else may be waiting; don't leave an unretrieved exception behind
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _load_or_generate(self, key: str, prompt: str) -> Optional[bytes]:
+        await self._ensure_index()
+        updated = self._index.get(key)
+        if updated and datetime.now(timezone.utc) - updated < self.max_age:
+            try:
+                image = await asyncio.to_thread(self._download_sync, key)
+            except Exception as e:
+                print(f"[frame-cache] Download of {key[:12]} failed: {e}")
+                image = None
+            if image:
+                self.gcs_hits += 1
+                self.saved_seconds += self._typical_generate_seconds()
+                self._remember(key, image)
+                return image
+            self._index.pop(key, None)
+
+        self.misses += 1
+        started = time.monotonic()
+        raw = await self.vertex_service.generate_starting_frame(prompt)
+        if not raw:
+            return None
+        self._generate_seconds = [*self._generate_seconds[-49:], time.monotonic() - started]
+        # imagen hands back a ~2MB png; store the same 720x1280 jpeg source images get
+        image = await asyncio.to_thread(normalize_frame, raw) or raw
+        self._remember(key, image)
+        if self.bucket:
+            try:
+                await asyncio.to_thread(self._upload_sync, key, image)
+                self._index[key] = datetime.now(timezone.utc)
+            except Exception as e:
+                print(f"[frame-cache] Failed to store frame {key[:12]}: {e}")
+        return image
+
+    def _typical_generate_seconds(self) -> float:
+        if not self._generate_seconds:
+            return 0.0
+        return sorted(self._generate_seconds)[len(self._generate_seconds) // 2]
+
+    def _delete_sync(self, keys: list[str]) -> None:
+        for key in keys:
+            try:
+                self.bucket.blob(f"{_PREFIX}{key}.jpg").delete()
+            except NotFound:
+                pass
+
+    # drops frames past max age, then the oldest beyond max entries
+    async def evict(self) -> dict:
+        if not self.bucket:
+            return {"evicted": 0, "remaining": 0}
+        # relist so frames written by other instances count toward the limit too
+        listed = dict(await asyncio.to_thread(self._list_sync))
+        self._index = listed
+        self._indexed = True
+        cutoff = datetime.now(timezone.utc) - self.max_age
+        by_age = sorted(listed.items(), key=lambda item: item[1])
+        expired = [key for key, updated in by_age if updated < cutoff]
+        keep = [key for key, updated in by_age if updated >= cutoff]
+        overflow = keep[:max(0, len(keep) - self.max_entries)]
+        doomed = expired + overflow
+        if doomed:
+            await asyncio.to_thread(self._delete_sync, doomed)
+            for key in doomed:
+                self._index.pop(key, None)
+                dropped = self._memory.pop(key, None)
+                if dropped is not None:
+                    self._memory_bytes -= len(dropped)
+        self.evicted += len(doomed)
+        print(f"[frame-cache] Evicted {len(expired)} expired and {len(overflow)} overflow frames")
+        return {"evicted": len(doomed), "remaining": len(self._index)}
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.gcs_hits + self.misses
+        return {
+            "indexed": len(self._index),
+            "memory_entries": len(self._memory),
+            "memory_mb": round(self._memory_bytes / 1024 / 1024, 2),
+            "memory_hits": self.memory_hits,
+            "gcs_hits": self.gcs_hits,
+            "misses": self.misses,
+            "shared_inflight": self.shared,
+            "hit_rate": round((self.memory_hits + self.gcs_hits) / lookups, 3) if lookups else 0.0,
+            "evicted": self.evicted,
+            "imagen_p50_s": round(self._typical_generate_seconds(), 2),
+            "saved_imagen_s": round(self.saved_seconds, 1),
+        }
@@ -1,84 +1,60 @@
 import asyncio
-import json
 import logging
+import time
 import traceback
 import uuid
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
-from urllib.parse import urlparse
-from google.cloud import storage
-import aiohttp
 from models.job import VideoJobRequest
 from services.firestore_service import FirestoreService
-from services.vertex_service import VertexService
+from services.frame_cache_service import FrameCacheService
+from services.job_status_service import TERMINAL_STATUSES, JobStatusService
+from services.job_store_service import JobStoreService
+from services.render_index_service import DONE, RENDERING, RenderIndexService, render_key
+from services.veo_poller_service import VeoPollerService
+from services.vertex_service import VeoSubmitTimeout, VertexService
+from utils.concurrency import concurrency
 from utils.env import settings
 from utils.gemini_prompt_builder import create_first_image_prompt
-from utils.prompt_enhancer import detect_and_sanitize
+from utils.image_ingest import image_ingest, image_mime_type
+from utils.prompt_enhancer import detect_and_sanitize, detect_locally
 from utils.veo_prompt_builder import create_video_prompt
 
 logger = logging.getLogger("job_service")
-IMAGE_REQUEST_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
-    ),
-    "Accept": "image/avif,image/webp,image/apng,image/png,image/jpeg,image/*,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
-}
-
-
-def _looks_like_image(data: bytes) -> bool:
-    if not data:
-        return False
-    if data.startswith(b"\x89PNG\r\n\x1a\n"):
-        return True
-    if data.startswith(b"\xff\xd8\xff"):
-        return True
-    if data.startswith(b"GIF87a") or data.startswith(b"GIF89a"):
-        return True
-    if data.startswith(b"RIFF") and data[8:12] == b"WEBP":
-        return True
-    if len(data) > 12 and data[4:12] == b"ftypavif":
-        return True
-    return False
-
-
-async def fetch_image_from_url(url: str) -> Optional[bytes]:
-    parsed = urlparse((url or "").strip())
-    if parsed.scheme not in {"http", "https"} or not parsed.netloc:
-        return None
-
-    request_headers = {
-        **IMAGE_REQUEST_HEADERS,
-        "Referer": f"{parsed.scheme}://{parsed.netloc}/",
-    }
-    try:
-        connector = aiohttp.TCPConnector(ssl=False)
-        async with aiohttp.ClientSession(headers=request_headers, connector=connector) as session:
-            async with session.get(
-                url,
-                timeout=aiohttp.ClientTimeout(total=15),
-                allow_redirects=True,
-            ) as response:
-                if response.status != 200:
-                    return None
-                payload = await response.read()
-                content_type = (response.headers.get("Content-Type") or "").lower()
-                if content_type.startswith("image/") or _looks_like_image(payload):
-                    return payload
-    except Exception as e:
-        print(f"Failed to fetch image from {url}: {e}", flush=True)
-    return None
 
 
 class JobService:
-    def __init__(self, vertex_service: VertexService, firestore_service: FirestoreService):
+    def __init__(
+        self,
+        vertex_service: VertexService,
+        firestore_service: FirestoreService,
+        veo_poller: VeoPollerService,
+        render_index: RenderIndexService,
+        frame_cache: FrameCacheService,
+        job_status: JobStatusService,
+        job_store: JobStoreService,
+    ):
         logger.info("Initializing JobService...")
         self.vertex_service = vertex_service
         self.firestore_service = firestore_service
-
-        self.local_queue: asyncio.Queue[dict] = asyncio.Queue()
-        self.local_worker_task: asyncio.Task | None = None
+        self.veo_poller = veo_poller
+        self.render_index = render_index
+        self.frame_cache = frame_cache
+        self.job_status = job_status
+        self.job_store = job_store
+
+        self.local_queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=settings.JOB_QUEUE_MAX)
+        self.local_workers: list[asyncio.Task] = []
+        self._queued_at: dict[str, float] = {}
+        # job_id -> {"started_at", "stage", "timings"} for everything inside process_video_job
+        self._active_jobs: dict[str, dict] = {}
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.stage_timings: deque[dict] = deque(maxlen=200)
+        self.speculation_used = 0
+        self.speculation_discarded = 0
 
         self.cloud_tasks = None
         if settings.WORKER_SERVICE_URL:
@@ -89,35 +65,24 @@ class JobService:
         else:
             logger.info("CloudTasks disabled, using local worker queue")
 
-        self.storage_client: storage.Client | None = None
-        self.bucket = None
-        if settings.GOOGLE_CLOUD_BUCKET_NAME:
-            try:
-                logger.info(f"Initializing GCS client for bucket: {settings.GOOGLE_CLOUD_BUCKET_NAME}")
-                self.storage_client = storage.Client(
-                    project=settings.GOOGLE_CLOUD_PROJECT or None
-                )
-                self.bucket = self.storage_client.bucket(settings.GOOGLE_CLOUD_BUCKET_NAME)
-                logger.info(f"GCS bucket initialized successfully: {self.bucket.name}")
-            except Exception as exc:
-                logger.error(f"Failed to initialize GCS job persistence: {exc}")
-        else:
-            logger.warning("GOOGLE_CLOUD_BUCKET_NAME not set - job persistence disabled")
+        # starting frames go to the same bucket the job store persists to
+        self.bucket = job_store.bucket
 
 
-    def _image_blob_path(self, job_id: str, image_num: int) -> str:
-        return f"images/{job_id}/image{image_num}.png"
+    def _image_blob_path(self, job_id: str, image_num: int, mime_type: str = "image/png") -> str:
+        return f"images/{job_id}/image{image_num}.{mime_type.split('/')[-1]}"
 
     def _upload_image_sync(self, job_id: str, image_num: int, image_data: bytes) -> str:
         if not self.bucket:
             logger.warning(f"_upload_image_sync: No bucket configured, cannot save image")
             return ""
 
-        blob_path = self._image_blob_path(job_id, image_num)
+        mime_type = image_mime_type(image_data)
+        blob_path = self._image_blob_path(job_id, image_num, mime_type)
         logger.info(f"[{job_id}] Uploading image {image_num} to {blob_path} ({len(image_data)} bytes)")
 
         blob = self.bucket.blob(blob_path)
-        blob.upload_from_string(image_data, content_type="image/png")
+        blob.upload_from_string(image_data, content_type=mime_type)
 
         gs_uri = f"gs://{self.bucket.name}/{blob_path}"
         logger.info(f"[{job_id}] Image {image_num} uploaded: {gs_uri}")
@@ -131,67 +96,27 @@ class JobService:
         logger.info(f"_generate_signed_url: Using public URL: {public_url}")
         return public_url
 
-    def _download_job_sync(self, job_id: str) -> Optional[dict]:
-        if not self.bucket or not self.storage_client:
-            logger.debug(f"_download_job_sync: no bucket/client for job {job_id}")
-            return None
-
-        blob_path = f"jobs/{job_id}.json"
-        logger.debug(f"_download_job_sync: checking blob {blob_path}")
-        blob = self.bucket.blob(blob_path)
-        if not blob.exists(client=self.storage_client):
-            logger.debug(f"_download_job_sync: blob does not exist: {blob_path}")
-            return None
-
-        logger.debug(f"_download_job_sync: downloading blob {blob_path}")
-        raw = blob.download_as_text()
-        data = json.loads(raw)
-        logger.info(f"_download_job_sync: loaded job {job_id} from GCS, status={data.get('status')}")
-        return data if isinstance(data, dict) else None
-
-    def _upload_job_sync(self, job_id: str, data: dict):
-        if not self.bucket:
-            logger.debug(f"_upload_job_sync: no bucket configured for job {job_id}")
-            return
-        blob_path = f"jobs/{job_id}.json"
-        logger.info(f"_upload_job_sync: uploading job {job_id} to {blob_path}, status={data.get('status')}")
-        blob = self.bucket.blob(blob_path)
-        blob.upload_from_string(
-            json.dumps(data, separators=(",", ":"), sort_keys=True),
-            content_type="application/json",
-        )
-        logger.debug(f"_upload_job_sync: upload complete for job {job_id}")
-
-    async def _save_job(self, job_id: str, data: dict):
-        if self.bucket:
-            try:
-                await asyncio.to_thread(self._upload_job_sync, job_id, data)
-            except Exception as exc:
-                print(f"Failed to persist job {job_id} to bucket: {exc}")
-
-    async def _load_job(self, job_id: str) -> Optional[dict]:
-        if not self.bucket or not self.storage_client:
-            return None
-
-        try:
-            return await asyncio.to_thread(self._download_job_sync, job_id)
-        except Exception as exc:
-            logger.error(f"Failed to load job {job_id} from GCS: {exc}")
-            return None
+    async def _save_job(self, job_id: str, data: dict, flush: bool = False):
+        # only a job running in this process is kept current here. one handed to cloud tasks may
+        # run on another instance, so its entry gets re-read from gcs like any remote job
+        local = job_id in self._active_jobs or not self.cloud_tasks
+        entry = self.job_status.update(job_id, data, local=local)
+        # readers on other instances (or after eviction) long-poll against this same version
+        await self.job_store.update(job_id, {**data, "version": entry["version"]}, flush=flush)
 
     async def _ensure_local_worker(self):
         if self.cloud_tasks:
             return
 
-        if self.local_worker_task and not self.local_worker_task.done():
-            return
-
-        self.local_worker_task = asyncio.create_task(self._local_worker_loop())
+        self.local_workers = [task for task in self.local_workers if not task.done()]
+        for _ in range(settings.JOB_WORKERS - len(self.local_workers)):
+            self.local_workers.append(asyncio.create_task(self._local_worker_loop()))
 
     async def _local_worker_loop(self):
         while True:
             item = await self.local_queue.get()
             job_id = item.get("job_id", "unknown")
+            self._queued_at.pop(job_id, None)
             try:
                 await self.process_video_job(job_id, item)
             except Exception as exc:
@@ -200,11 +125,175 @@ class JobService:
             finally:
                 self.local_queue.task_done()
 
+    async def get_job_status(self, job_id: str) -> Optional[dict]:
+        entry = self.job_status.get(job_id)
+        if entry is not None and not self.job_status.needs_refresh(job_id):
+            return entry
+        # not running here (or evicted): read it back from gcs
+        data = await self.job_store.load(job_id)
+        if data is None:
+            return entry
+        return self.job_status.update(job_id, data, local=False)
+
+    async def get_job_statuses(self, job_ids: list[str]) -> dict[str, Optional[dict]]:
+        entries = await asyncio.gather(*[self.get_job_status(job_id) for job_id in job_ids])
+        return dict(zip(job_ids, entries))
+
+    # long-poll: returns once the job moves past after_version, ends, or the timeout runs out
+    async def wait_for_job_status(self, job_id: str, after_version: int, timeout: float) -> Optional[dict]:
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = await self.get_job_status(job_id)
+            if entry is None or entry["version"] > after_version or entry.get("status") in TERMINAL_STATUSES:
+                return entry
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return entry
+            # local writes wake this immediately; remote jobs get re-read once the entry goes stale
+            await self.job_status.wait_for_change(job_id, after_version, min(remaining, self.job_status.remote_ttl))
+
+    def local_queue_full(self) -> bool:
+        return not self.cloud_tasks and self.local_queue.full()
+
+    # speculative work runs with publish=False so it can't flip the public stage under the main
+    # path, and with its own timing key so it isn't mistaken for time the job spent waiting
+    @asynccontextmanager
+    async def _stage(
+        self,
+        job_id: str,
+        name: str,
+        limited: bool = True,
+        publish: bool = True,
+        timing: Optional[str] = None,
+    ):
+        timing = timing or name
+        job = self._active_jobs.get(job_id)
+        if job is not None and publish:
+            job["stage"] = f"{name}:waiting" if limited else name
+            self.job_status.set_stage(job_id, name)
+        started = time.monotonic()
+        try:
+            if not limited:
+                yield
+            else:
+                async with concurrency.slot(name, upstream=False):
+                    self._add_timing(job, f"{timing}_wait", time.monotonic() - started)
+                    started = time.monotonic()
+                    if job is not None and publish:
+                        job["stage"] = name
+                    yield
+        finally:
+            self._add_timing(job, timing, time.monotonic() - started)
+
+    @staticmethod
+    def _add_timing(job: Optional[dict], name: str, seconds: float) -> None:
+        if job is not None:
+            timings = job["timings"]
+            timings[name] = round(timings.get(name, 0.0) + seconds, 3)
+
+    def _job_timings(self, job_id: str) -> dict:
+        job = self._active_jobs.get(job_id)
+        return dict(job["timings"]) if job else {}
+
+    def _average_timings(self) -> dict:
+        totals: dict[str, list[float]] = {}
+        for timings in self.stage_timings:
+            for name, seconds in timings.items():
+                totals.setdefault(name, []).append(seconds)
+        return {name: round(sum(values) / len(values), 3) for name, values in sorted(totals.items())}
+
+    def worker_stats(self) -> dict:
+        now = time.monotonic()
+        stages: dict[str, int] = {}
+        for job in self._active_jobs.values():
+            stages[job["stage"]] = stages.get(job["stage"], 0) + 1
+        stage_limits = concurrency.stats()["stages"]
+        return {
+            "mode": "cloud_tasks" if self.cloud_tasks else "local",
+            "workers": len([task for task in self.local_workers if not task.done()]),
+            "queue_depth": self.local_queue.qsize(),
+            "queue_max": self.local_queue.maxsize,
+            "oldest_queued_s": round(max((now - t for t in self._queued_at.values()), default=0.0), 1),
+            "active_jobs": len(self._active_jobs),
+            "oldest_active_s": round(
+                max((now - job["started_at"] for job in self._active_jobs.values()), default=0.0), 1
+            ),
+            "jobs_by_stage": stages,
+            "stage_slots": {name: stage_limits[name] for name in ("sanitize", "image", "upload", "veo")},
+            "completed": self.jobs_completed,
+            "failed": self.jobs_failed,
+            # averages over the last jobs; early_saved is what overlapping sanitize and image bought
+            "stage_timings_avg_s": self._average_timings(),
+            "speculation": {"used": self.speculation_used, "discarded": self.speculation_discarded},
+        }
+
+    async def _finish_with_render(self, job_id: str, job_data: dict, entry: dict, job_start_time: str):
+        jid = job_id[:8]
+        key = render_key(job_data["title"], job_data.get("outcome") or "", job_data.get("trade_side"))
+        await self.render_index.note_reused(key)
+        print(f"[{jid}] [pipeline] ↳ Reusing render from job {str(entry.get('job_id'))[:8]}: {entry.get('video_url')}", flush=True)
+        await self._save_job(job_id, {
+            "status": "done",
+            "video_uri": entry.get("video_uri"),
+            "video_url": entry.get("video_url"),
+            "reused_from": entry.get("job_id"),
+            "job_start_time": job_start_time,
+            "job_end_time": datetime.now().isoformat(),
+            "title": job_data["title"],
+            "outcome": job_data.get("outcome"),
+            "original_trade_link": job_data.get("original_trade_link"),
+            "kalshi": job_data.get("kalshi"),
+            "trade_side": job_data.get("trade_side"),
+        }, flush=True)
+        await self.firestore_service.store_generated_video(job_id, {
+            "video_url": entry.get("video_url"),
+            "title": job_data["title"],
+            "kalshi": job_data.get("kalshi", []),
+            "trade_side": job_data.get("trade_side", ""),
+            "reused_from": entry.get("job_id"),
+        })
+
+    # None once this job owns the render, otherwise the finished render to reuse
+    async def _claim_or_attach_render(self, job_id: str, key: str) -> Optional[dict]:
+        jid = job_id[:8]
+        for _ in range(3):
+            state, entry = await self.render_index.claim(key, job_id)
+            if state == DONE:
+                return entry
+            if state != RENDERING:
+                return None
+            print(f"[{jid}] [pipeline] ↳ Same render in flight on job {str(entry.get('job_id'))[:8]}, attaching...", flush=True)
+            async with self._stage(job_id, "attached", limited=False):
+                entry = await self.render_index.wait_for(key, entry.get("job_id"))
+            if entry:
+                return entry
+            print(f"[{jid}] [pipeline] ↳ Attached render did not finish, claiming it again", flush=True)
+        return None
+
     async def create_video_job(self, request: VideoJobRequest) -> str:
         job_id = str(uuid.uuid4())
         jid = job_id[:8]
         print(f"[{jid}] [pipeline] 5. create_video_job — title=\"{request.title[:50]}\"", flush=True)
 
+        entry = await self.render_index.find_completed(render_key(request.title, request.outcome, request.trade_side))
+        if entry:
+            try:
+                await self._finish_with_render(job_id, {
+                    "title": request.title,
+                    "outcome": request.outcome,
+                    "original_trade_link": request.original_trade_link,
+                    "kalshi": request.kalshi,
+                    "trade_side": request.trade_side,
+                }, entry, datetime.now().isoformat())
+                print(f"[{jid}] [pipeline] 6. Job completed from render index — no pipeline run", flush=True)
+                return job_id
+            except Exception as exc:
+                print(f"[{jid}] [pipeline] ✗ Render reuse failed, running the pipeline: {exc}", flush=True)
+
+        if self.local_queue_full():
+            # turn it away before anything is saved for it
+            raise asyncio.QueueFull()
+
         await self._save_job(
             job_id,
             {
@@ -215,8 +304,10 @@ class JobService:
                 "original_trade_link": request.original_trade_link,
                 "source_image_url": request.source_image_url,
             },
+            # a cloud tasks worker elsewhere reads this back; locally it can ride the next flush
+            flush=bool(self.cloud_tasks),
         )
-        print(f"[{jid}] [pipeline] ↳ Job saved to GCS with status=pending", flush=True)
+        print(f"[{jid}] [pipeline] ↳ Job saved with status=pending", flush=True)
 
         job_data = {
             "title": request.title,
@@ -233,43 +324,108 @@ class JobService:
         else:
             print(f"[{jid}] [pipeline] ↳ Enqueueing to local worker queue", flush=True)
             await self._ensure_local_worker()
-            await self.local_queue.put({"job_id": job_id, **job_data})
+            try:
+                # never block the request on a full queue; the caller turns this into a 503
+                self.local_queue.put_nowait({"job_id": job_id, **job_data})
+            except asyncio.QueueFull:
+                await self._save_job(job_id, {
+                    "status": "error",
+                    "error": "job queue is full",
+                    "job_end_time": datetime.now().isoformat(),
+                }, flush=True)
+                raise
+            self._queued_at[job_id] = time.monotonic()
 
         print(f"[{jid}] [pipeline] 6. Job queued — returning job_id to frontend", flush=True)
         return job_id
 
     async def _submit_and_poll_veo(
         self,
-        jid: str,
+        job_id: str,
         veo_prompt: str,
         source_image: bytes,
     ) -> tuple[str, str | None]:
+        jid = job_id[:8]
         # submit to veo
-        operation = await self.vertex_service.generate_video_content(
-            prompt=veo_prompt,
-            image_data=source_image,
-        )
+        try:
+            async with self._stage(job_id, "veo"):
+                operation = await self.vertex_service.generate_video_content(
+                    prompt=veo_prompt,
+                    image_data=source_image,
+                )
+        except VeoSubmitTimeout as exc:
+            # not a failed render: the operation may be running. keep what's needed to find it
+            print(f"[{jid}] [pipeline] ✗ Veo submit unconfirmed (request {exc.request_id})", flush=True)
+            await self._save_job(job_id, {
+                "veo_request_id": exc.request_id,
+                "veo_output_gcs_uri": exc.output_gcs_uri,
+            })
+            return "error", str(exc)
         print(f"[{jid}] [pipeline] ↳ Veo operation started: {operation.name}", flush=True)
 
-        max_polls = 60  # ~5 minutes at 5s intervals
-        for poll_num in range(1, max_polls + 1):
-            await asyncio.sleep(5)
-            print(f"[{jid}] [pipeline] 9a. Polling Veo (attempt {poll_num}/{max_polls})...", flush=True)
-            result = await self.vertex_service.get_video_status_by_name(operation.name)
-            print(f"[{jid}] [pipeline] ↳ Veo status: {result.status}", flush=True)
-
-            if result.status == "done":
-                return "done", result.video_url
-
-            if result.status == "error":
-                return "error", result.error or "Unknown Veo error"
+        # one shared poller checks every in-flight operation on a schedule fit to recent render times
+        print(f"[{jid}] [pipeline] 9a. Waiting on Veo poller ({self.veo_poller.stats()['in_flight']} in flight)...", flush=True)
+        async with self._stage(job_id, "veo_render", limited=False):
+            return await self.veo_poller.wait(operation.name, label=jid)
 
-        return "error", f"Veo timed out after {max_polls * 5} seconds"
+    # source image for the job before sanitize has answered: the url if it fetches, then imagen
+    # when image_prompt is given (only once the local check has settled the prompt). the caller
+    # decides whether the result is usable
+    async def _speculative_frame(
+        self,
+        job_id: str,
+        source_image_url: Optional[str],
+        image_prompt: Optional[str],
+    ) -> tuple[Optional[bytes], str]:
+        jid = job_id[:8]
+        if source_image_url:
+            print(f"[{jid}] [pipeline] 7c. Fetching source image from URL: {source_image_url[:80]}", flush=True)
+            async with self._stage(job_id, "image", publish=False, timing="speculative_fetch"):
+                source_image = await image_ingest.fetch(source_image_url)
+            if source_image:
+                print(f"[{jid}] [pipeline] ↳ Source image fetched ({len(source_image)} bytes)", flush=True)
+                return source_image, "url"
+            print(f"[{jid}] [pipeline] ↳ Source image fetch FAILED", flush=True)
+        job = self._active_jobs.get(job_id)
+        if image_prompt is None or job is None or job.get("speculation_dropped"):
+            return None, "url"
+        print(f"[{jid}] [pipeline] 7d. Generating starting frame via Gemini Imagen (early)...", flush=True)
+        async with self._stage(job_id, "image", publish=False, timing="speculative_imagen"):
+            source_image = await self.frame_cache.get_or_generate(image_prompt)
+        return source_image, "imagen"
+
+    # not cancelled: fetches and imagen calls are single-flighted through the ingest and frame
+    # caches, and cancelling the leader would cancel them for every other job waiting on the
+    # same key (frame_cache followers get CancelledError, image_ingest ones a None). the flag
+    # keeps the task from starting imagen; anything already running finishes into the cache
+    def _discard(self, job_id: str, task: asyncio.Task, reason: str) -> None:
+        self.speculation_discarded += 1
+        job = self._active_jobs.get(job_id)
+        if job is not None:
+            job["speculation_dropped"] = True
+        print(f"[{job_id[:8]}] [pipeline] ↳ Discarding speculative frame: {reason}", flush=True)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def _upload_frame(self, job_id: str, source_image: bytes) -> str:
+        jid = job_id[:8]
+        try:
+            async with self._stage(job_id, "upload", publish=False):
+                image_uri = await asyncio.to_thread(self._upload_image_sync, job_id, 1, source_image)
+        except Exception as exc:
+            # the gcs copy is only kept for reference; veo gets the bytes directly
+            print(f"[{jid}] [pipeline] ✗ Starting frame upload failed: {exc}", flush=True)
+            return ""
+        print(f"[{jid}] [pipeline] ↳ Uploaded: {image_uri}", flush=True)
+        if image_uri:
+            await self._save_job(job_id, {"image_uri": image_uri})
+        return image_uri
 
     async def process_video_job(self, job_id: str, job_data: dict):
         jid = job_id[:8]
         start_time = datetime.now().isoformat()
-        existing_job = await self._load_job(job_id)
+        self._active_jobs[job_id] = {"started_at": time.monotonic(), "stage": "load", "timings": {}}
+        existing_job = await self.job_store.load(job_id, hold=True)
+        key = None
         print(f"[{jid}] [pipeline] 7. process_video_job START", flush=True)
 
         try:
@@ -279,9 +435,37 @@ class JobService:
                 raise ValueError("outcome is required")
             original_trade_link = job_data["original_trade_link"]
             source_image_url = job_data.get("source_image_url")
-            
+
+            key = render_key(title, outcome, job_data.get("trade_side"))
+            reusable = await self._claim_or_attach_render(job_id, key)
+            if reusable:
+                key = None
+                job_start_time = existing_job.get("job_start_time") if existing_job else start_time
+                await self._finish_with_render(job_id, {**job_data, "outcome": outcome}, reusable, job_start_time)
+                self.jobs_completed += 1
+                return
+
+            # the image only depends on sanitize when real people turn up, so the source url is
+            # fetched alongside it. imagen only goes early when the local check has already
+            # settled the prompt; one the llm may still reword would cost a second imagen call
+            early_started = time.monotonic()
+            local = detect_locally(title, outcome)
+            image_prompt = create_first_image_prompt(
+                title=local.safe_title,
+                outcome=local.safe_outcome,
+                original_trade_link=original_trade_link,
+            ) if local else None
+            image_task = None
+            if source_image_url or image_prompt:
+                image_task = asyncio.create_task(self._speculative_frame(job_id, source_image_url, image_prompt))
             print(f"[{jid}] [pipeline] 7a. Detecting real people in prompt...", flush=True)
-            analysis = await detect_and_sanitize(title, outcome)
+            try:
+                async with self._stage(job_id, "sanitize"):
+                    analysis = await detect_and_sanitize(title, outcome)
+            except BaseException:
+                if image_task:
+                    self._discard(job_id, image_task, "sanitize failed")
+                raise
 
             veo_title = analysis.safe_title
             veo_outcome = analysis.safe_outcome
@@ -293,36 +477,51 @@ class JobService:
             else:
                 print(f"[{jid}] [pipeline] ↳ No real people detected, using original prompt", flush=True)
 
+            frame_prompt = create_first_image_prompt(
+                title=veo_title,
+                outcome=veo_outcome,
+                original_trade_link=original_trade_link,
+            )
             source_image = None
+            # speculative time only counts toward early_saved when the job actually waited on it
+            speculation_awaited = False
 
-            if not analysis.has_real_people and source_image_url:
-                print(f"[{jid}] [pipeline] 7c. Fetching source image from URL: {source_image_url[:80]}", flush=True)
-                source_image = await fetch_image_from_url(source_image_url)
-                if source_image:
-                    print(f"[{jid}] [pipeline] ↳ Source image fetched ({len(source_image)} bytes)", flush=True)
-                else:
-                    print(f"[{jid}] [pipeline] ↳ Source image fetch FAILED", flush=True)
-            elif analysis.has_real_people and source_image_url:
+            if analysis.has_real_people and source_image_url:
                 print(f"[{jid}] [pipeline] ↳ Skipping source_image_url (real people detected — would trigger Veo safety)", flush=True)
+                self._discard(job_id, image_task, "source image not allowed")
+            elif image_task:
+                self._active_jobs[job_id]["stage"] = "image"
+                self.job_status.set_stage(job_id, "image")
+                source_image, origin = await image_task
+                speculation_awaited = True
+                if origin == "imagen" and frame_prompt != image_prompt:
+                    # the gazetteer moved under us and the llm reworded it after all
+                    self._discard(job_id, image_task, "sanitized prompt differs")
+                    source_image = None
+                elif source_image:
+                    self.speculation_used += 1
 
             if not source_image:
                 print(f"[{jid}] [pipeline] 7d. Generating starting frame via Gemini Imagen...", flush=True)
-                image_prompt = create_first_image_prompt(
-                    title=veo_title,
-                    outcome=veo_outcome,
-                    original_trade_link=original_trade_link,
-                )
-                source_image = await self.vertex_service.generate_starting_frame(image_prompt)
+                async with self._stage(job_id, "image"):
+                    source_image = await self.frame_cache.get_or_generate(frame_prompt)
                 if source_image:
                     print(f"[{jid}] [pipeline] ↳ Gemini starting frame generated ({len(source_image)} bytes)", flush=True)
                 else:
                     raise ValueError("Failed to generate starting frame — all methods exhausted")
 
-            image_uri = ""
+            timings = self._active_jobs[job_id]["timings"]
+            timings["early_wall"] = round(time.monotonic() - early_started, 3)
+            sequential = timings.get("sanitize", 0.0) + timings.get("image", 0.0)
+            if speculation_awaited:
+                sequential += timings.get("speculative_fetch", 0.0) + timings.get("speculative_imagen", 0.0)
+            timings["early_saved"] = round(max(0.0, sequential - timings["early_wall"]), 3)
+
+            # veo takes the bytes, not the gcs copy, so the upload runs alongside the submit
+            upload_task = None
             if self.bucket and source_image:
-                print(f"[{jid}] [pipeline] 7e. Uploading starting frame to GCS...", flush=True)
-                image_uri = await asyncio.to_thread(self._upload_image_sync, job_id, 1, source_image)
-                print(f"[{jid}] [pipeline] ↳ Uploaded: {image_uri}", flush=True)
+                print(f"[{jid}] [pipeline] 7e. Uploading starting frame to GCS in the background...", flush=True)
+                upload_task = asyncio.create_task(self._upload_frame(job_id, source_image))
 
             print(f"[{jid}] [pipeline] 8. Submitting to Veo for video generation (720p)...", flush=True)
             print(f"[{jid}] [pipeline] ↳ veo_title=\"{veo_title}\"", flush=True)
@@ -340,32 +539,35 @@ class JobService:
                 "title": title,
                 "outcome": outcome,
                 "original_trade_link": original_trade_link,
-                "image_uri": image_uri,
                 "kalshi": job_data.get("kalshi"),
                 "trade_side": job_data.get("trade_side"),
             })
-            print(f"[{jid}] [pipeline] ↳ Job saved with status=processing, polling Veo until done...", flush=True)
+            print(f"[{jid}] [pipeline] ↳ Job marked processing (write-behind), polling Veo until done...", flush=True)
 
-            status, result_value = await self._submit_and_poll_veo(jid, veo_prompt, source_image)
+            try:
+                status, result_value = await self._submit_and_poll_veo(job_id, veo_prompt, source_image)
+            finally:
+                # its image_uri save has to land before the terminal flush
+                if upload_task:
+                    await upload_task
 
+            self._active_jobs[job_id]["stage"] = "finalize"
             if status == "done":
+                self.jobs_completed += 1
                 video_uri = result_value
                 video_url = self._generate_signed_url(video_uri) if video_uri else None
                 print(f"[{jid}] [pipeline] 9b. Veo DONE — video_url={video_url}", flush=True)
+                if video_uri:
+                    await self.render_index.complete(key, job_id, video_uri, video_url)
+                    key = None
 
                 await self._save_job(job_id, {
                     "status": "done",
                     "video_uri": video_uri,
                     "video_url": video_url,
-                    "job_start_time": existing_job.get("job_start_time") if existing_job else start_time,
                     "job_end_time": datetime.now().isoformat(),
-                    "title": title,
-                    "outcome": outcome,
-                    "original_trade_link": original_trade_link,
-                    "image_uri": image_uri,
-                    "kalshi": job_data.get("kalshi"),
-                    "trade_side": job_data.get("trade_side"),
-                })
+                    "stage_timings": self._job_timings(job_id),
+                }, flush=True)
 
                 try:
                     print(f"[{jid}] [pipeline] 9c. Storing in Firestore generated_videos...", flush=True)
@@ -379,16 +581,15 @@ class JobService:
                 except Exception as fs_exc:
                     print(f"[{jid}] [pipeline] ✗ Failed to store in Firestore: {fs_exc}", flush=True)
             else:
+                self.jobs_failed += 1
                 error_msg = result_value or "Unknown error"
                 print(f"[{jid}] [pipeline] ✗ Veo ERROR: {error_msg}", flush=True)
                 await self._save_job(job_id, {
                     "status": "error",
                     "error": error_msg,
-                    "job_start_time": existing_job.get("job_start_time") if existing_job else start_time,
-                    "title": title,
-                    "outcome": outcome,
-                    "original_trade_link": original_trade_link,
-                })
+                    "job_end_time": datetime.now().isoformat(),
+                    "stage_timings": self._job_timings(job_id),
+                }, flush=True)
                 try:
                     await self.firestore_service.store_generated_video(job_id, {
                         "status": "error",
@@ -402,16 +603,19 @@ class JobService:
                     print(f"[{jid}] [pipeline] ✗ Failed to store error in Firestore: {fs_exc}", flush=True)
 
         except Exception as exc:
+            self.jobs_failed += 1
             print(f"[{jid}] [pipeline] ✗ ERROR in process_video_job: {exc}", flush=True)
             traceback.print_exc()
             await self._save_job(job_id, {
                 "status": "error",
                 "error": str(exc),
                 "job_start_time": existing_job.get("job_start_time") if existing_job else start_time,
+                "job_end_time": datetime.now().isoformat(),
                 "title": job_data.get("title"),
                 "outcome": job_data.get("outcome") or job_data.get("caption"),
                 "original_trade_link": job_data.get("original_trade_link"),
-            })
+                "stage_timings": self._job_timings(job_id),
+            }, flush=True)
             try:
                 await self.firestore_service.store_generated_video(job_id, {
                     "status": "error",
@@ -423,3 +627,11 @@ class JobService:
                 print(f"[{jid}] [pipeline] ↳ Error stored in Firestore — frontend will be notified", flush=True)
             except Exception as fs_exc:
                 print(f"[{jid}] [pipeline] ✗ Failed to store error in Firestore: {fs_exc}", flush=True)
+        finally:
+            self.job_store.release(job_id)
+            if key:
+                # render failed or never finished; let attached jobs take over
+                await self.render_index.release(key, job_id)
+            job = self._active_jobs.pop(job_id, None)
+            if job and job["timings"]:
+                self.stage_timings.append(job["timings"])
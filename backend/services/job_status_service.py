@@ -0,0 +1,109 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional
+from utils.env import settings
+
+TERMINAL_STATUSES = ("done", "error")
+# what status readers get; the rest of the persisted job (prompts, kalshi payload) stays out
+_PUBLIC_FIELDS = (
+    "status", "stage", "error", "video_url", "image_uri", "reused_from",
+    "job_start_time", "job_end_time", "title", "outcome", "trade_side",
+)
+
+
+def _next_version(current: int) -> int:
+    # wall-clock ms, bumped past the previous one: it only moves forward, and it is persisted
+    # with the job, so instances and reloads after eviction agree on ordering
+    return max(current + 1, int(time.time() * 1000))
+
+
+# latest status of recent jobs, written through by the pipeline on every save and stage
+# change. jobs running here are always current; ones read back from gcs (running on
+# another instance) are re-read once they're older than remote_ttl
+class JobStatusService:
+    def __init__(self) -> None:
+        self.max_entries = settings.JOB_STATUS_CACHE_ENTRIES
+        self.remote_ttl = settings.JOB_STATUS_REMOTE_TTL
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._remote: dict[str, float] = {}
+        self._waiters: dict[str, list[asyncio.Future]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def update(self, job_id: str, data: dict, local: bool = True) -> dict:
+        if local:
+            self._remote.pop(job_id, None)
+        else:
+            self._remote[job_id] = time.monotonic()
+        current = self._entries.get(job_id) or {"job_id": job_id, "status": "pending", "version": 0}
+        fields = {k: v for k, v in data.items() if k in _PUBLIC_FIELDS}
+        stored_version = data.get("version") if not local else None
+        if all(current.get(k) == v for k, v in fields.items()) and (
+            not stored_version or stored_version <= current["version"]
+        ):
+            return current
+        # a copy read back from gcs keeps the version it was written with
+        version = max(current["version"], stored_version) if stored_version else _next_version(current["version"])
+        entry = {**current, **fields, "version": version, "updated_at": time.time()}
+        if entry.get("status") in TERMINAL_STATUSES:
+            entry.pop("stage", None)
+        self._entries[job_id] = entry
+        self._entries.move_to_end(job_id)
+        while len(self._entries) > self.max_entries:
+            dropped, _ = self._entries.popitem(last=False)
+            self._remote.pop(dropped, None)
+        self.updates += 1
+        for waiter in self._waiters.pop(job_id, []):
+            if not waiter.done():
+                waiter.set_result(entry)
+        return entry
+
+    def set_stage(self, job_id: str, stage: str) -> None:
+        self.update(job_id, {"stage": stage})
+
+    def needs_refresh(self, job_id: str) -> bool:
+        fetched_at = self._remote.get(job_id)
+        if fetched_at is None:
+            return job_id not in self._entries
+        entry = self._entries.get(job_id) or {}
+        return entry.get("status") not in TERMINAL_STATUSES and time.monotonic() - fetched_at > self.remote_ttl
+
+    def get(self, job_id: str) -> Optional[dict]:
+        entry = self._entries.get(job_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(job_id)
+        return entry
+
+    # resolves with the entry once its version passes after_version, or None on timeout
+    async def wait_for_change(self, job_id: str, after_version: int, timeout: float) -> Optional[dict]:
+        entry = self._entries.get(job_id)
+        if entry is not None and (entry["version"] > after_version or entry.get("status") in TERMINAL_STATUSES):
+            return entry
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(job_id, []).append(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(job_id)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[job_id]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "remote_entries": len(self._remote),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "updates": self.updates,
+            "waiters": sum(len(w) for w in self._waiters.values()),
+        }
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+from google.api_core.exceptions import NotFound
+from google.cloud import storage
+from utils.env import settings
+
+logger = logging.getLogger("job_store")
+_RETRY_DELAY = 5.0
+
+
+# jobs/{id}.json with write-behind: field updates merge into an in-memory doc and one
+# debounced upload carries all of them. terminal updates flush right away, queued behind
+# any upload already in flight for that job so gcs never ends on an older snapshot
+class JobStoreService:
+    def __init__(self) -> None:
+        self.flush_delay = settings.JOB_STORE_FLUSH_DELAY
+        self._docs: dict[str, dict] = {}
+        self._dirty: set[str] = set()
+        self._held: dict[str, int] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._timers: dict[str, asyncio.Task] = {}
+        self.updates = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.bytes_written = 0
+        self.memory_reads = 0
+        self.gcs_reads = 0
+        self.gcs_misses = 0
+
+        self.bucket = None
+        if settings.GOOGLE_CLOUD_BUCKET_NAME:
+            try:
+                client = storage.Client(project=settings.GOOGLE_CLOUD_PROJECT or None)
+                self.bucket = client.bucket(settings.GOOGLE_CLOUD_BUCKET_NAME)
+            except Exception as exc:
+                logger.error(f"Failed to initialize GCS job persistence: {exc}")
+        else:
+            logger.warning("GOOGLE_CLOUD_BUCKET_NAME not set - job persistence disabled")
+
+    def _download_sync(self, job_id: str) -> Optional[dict]:
+        try:
+            raw = self.bucket.blob(f"jobs/{job_id}.json").download_as_text()
+        except NotFound:
+            return None
+        data = json.loads(raw)
+        return data if isinstance(data, dict) else None
+
+    def _upload_sync(self, job_id: str, payload: str) -> None:
+        self.bucket.blob(f"jobs/{job_id}.json").upload_from_string(payload, content_type="application/json")
+
+    # hold=True pins the doc in memory until release(), so later partial updates merge
+    # into the full job instead of overwriting it
+    async def load(self, job_id: str, hold: bool = False) -> Optional[dict]:
+        if job_id in self._docs:
+            self.memory_reads += 1
+            if hold:
+                self._held[job_id] = self._held.get(job_id, 0) + 1
+            return dict(self._docs[job_id])
+        data = None
+        if self.bucket:
+            try:
+                data = await asyncio.to_thread(self._download_sync, job_id)
+            except Exception as exc:
+                logger.error(f"Failed to load job {job_id} from GCS: {exc}")
+            self.gcs_reads += 1
+            if data is None:
+                self.gcs_misses += 1
+        if hold:
+            # an update may have landed while we were reading; it wins over the gcs copy
+            self._docs[job_id] = {**(data or {}), **self._docs.get(job_id, {})}
+            self._held[job_id] = self._held.get(job_id, 0) + 1
+        return data
+
+    def release(self, job_id: str) -> None:
+        remaining = self._held.get(job_id, 0) - 1
+        if remaining > 0:
+            self._held[job_id] = remaining
+            return
+        self._held.pop(job_id, None)
+        self._drop_if_idle(job_id)
+
+    def _drop_if_idle(self, job_id: str) -> None:
+        if job_id in self._held or job_id in self._dirty or job_id in self._timers:
+            return
+        self._docs.pop(job_id, None)
+        self._locks.pop(job_id, None)
+
+    async def update(self, job_id: str, fields: dict, flush: bool = False) -> None:
+        self._docs[job_id] = {**self._docs.get(job_id, {}), **fields}
+        self._dirty.add(job_id)
+        self.updates += 1
+        if not self.bucket:
+            self._dirty.discard(job_id)
+            self._drop_if_idle(job_id)
+            return
+        if flush:
+            timer = self._timers.pop(job_id, None)
+            if timer is not None:
+                timer.cancel()
+            await self.flush(job_id)
+        elif job_id not in self._timers:
+            self._timers[job_id] = asyncio.create_task(self._flush_later(job_id, self.flush_delay))
+
+    async def _flush_later(self, job_id: str, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        self._timers.pop(job_id, None)
+        await self.flush(job_id)
+
+    async def flush(self, job_id: str) -> bool:
+        lock = self._locks.setdefault(job_id, asyncio.Lock())
+        async with lock:
+            if job_id not in self._dirty:
+                return True
+            self._dirty.discard(job_id)
+            payload = json.dumps(self._docs[job_id], separators=(",", ":"), sort_keys=True, default=str)
+            try:
+                await asyncio.to_thread(self._upload_sync, job_id, payload)
+            except Exception as exc:
+                self.flush_failures += 1
+                self._dirty.add(job_id)
+                print(f"Failed to persist job {job_id} to bucket: {exc}")
+                if job_id not in self._timers:
+                    self._timers[job_id] = asyncio.create_task(self._flush_later(job_id, _RETRY_DELAY))
+                return False
+            self.flushes += 1
+            self.bytes_written += len(payload)
+            logger.info(f"flushed job {job_id}, status={self._docs[job_id].get('status')}")
+        self._drop_if_idle(job_id)
+        return True
+
+    async def flush_all(self) -> None:
+        for timer in list(self._timers.values()):
+            timer.cancel()
+        self._timers.clear()
+        await asyncio.gather(*[self.flush(job_id) for job_id in list(self._dirty)])
+
+    def stats(self) -> dict:
+        return {
+            "in_memory": len(self._docs),
+            "dirty": len(self._dirty),
+            "held": len(self._held),
+            "updates": self.updates,
+            "flushes": self.flushes,
+            "coalesced": max(0, self.updates - self.flushes),
+            "flush_failures": self.flush_failures,
+            "bytes_written": self.bytes_written,
+            "memory_reads": self.memory_reads,
+            "gcs_reads": self.gcs_reads,
+            "gcs_misses": self.gcs_misses,
+        }
@@ -10,6 +10,7 @@ import aiohttp
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 
+from utils.concurrency import concurrency
 from utils.env import settings
 
 # Disable SSL verification for local dev (macOS Python SSL cert issue)
@@ -35,6 +36,16 @@ SPORTS_CRYPTO_SERIES = {
     "s&p": "KXINX", "nasdaq": "KXINX", "dow": "KXINX",
 }
 
+# YouTube categories that corroborate a series match (17 = Sports)
+SERIES_CATEGORY_HINTS = {
+    "KXSB": {"17"}, "KXNBAGAME": {"17"}, "KXMLBGAME": {"17"},
+    "KXNHLGAME": {"17"}, "KXWCGAME": {"17"},
+}
+
+_series_term_patterns = {
+    term: re.compile(rf"(?<![\w&]){re.escape(term)}(?![\w&])") for term in SPORTS_CRYPTO_SERIES
+}
+
 
 class KalshiService:
     def __init__(self) -> None:
@@ -42,6 +53,7 @@ class KalshiService:
         self.private_key = self._load_private_key()
         self._kalshi_semaphore = asyncio.Semaphore(5)
         self._session: aiohttp.ClientSession | None = None
+        self._session_users = 0
 
     async def ensure_session(self) -> None:
         if self._session is None or self._session.closed:
@@ -52,6 +64,17 @@ class KalshiService:
             await self._session.close()
             self._session = None
 
+    # overlapping feed batches share one session; the last one out closes it
+    async def acquire_session(self) -> None:
+        self._session_users += 1
+        await self.ensure_session()
+
+    async def release_session(self) -> None:
+        self._session_users -= 1
+        if self._session_users <= 0:
+            self._session_users = 0
+            await self.close_session()
+
     def detect_series_from_keywords(self, keywords: list[str]) -> Optional[str]:
         keywords_lower = " ".join(keywords).lower()
         priority_terms = [
@@ -71,6 +94,33 @@ class KalshiService:
                 return series
         return None
 
+    @staticmethod
+    def detect_series_from_metadata(
+        title: str, tags: list[str], category_id: str = ""
+    ) -> Optional[tuple[str, list[str]]]:
+        title_lower = title.lower()
+        tags_lower = [t.lower() for t in tags]
+        scores: dict[str, int] = {}
+        matched_terms: dict[str, list[str]] = {}
+        for term, pattern in _series_term_patterns.items():
+            score = 2 * len(pattern.findall(title_lower))
+            score += sum(1 for tag in tags_lower if pattern.search(tag))
+            if not score:
+                continue
+            series = SPORTS_CRYPTO_SERIES[term]
+            scores[series] = scores.get(series, 0) + score
+            matched_terms.setdefault(series, []).append(term)
+
+        if len(scores) != 1:
+            # nothing matched, or the signals disagree; let the LLM decide
+            return None
+        series, score = next(iter(scores.items()))
+        if category_id and category_id in SERIES_CATEGORY_HINTS.get(series, set()):
+            score += 1
+        if score < 2:
+            return None
+        return series, matched_terms[series]
+
     def _load_private_key(self):
         # cloud run or local check
         if settings.KALSHI_PRIVATE_KEY_BASE64:
@@ -106,14 +156,14 @@ class KalshiService:
         await self.ensure_session()
         headers = self._get_headers("GET", path)
         for attempt in range(4):
-            async with self._kalshi_semaphore:
+            async with self._kalshi_semaphore, concurrency.slot("kalshi"):
                 assert self._session is not None
                 async with self._session.get(
                     url, params=params, headers=headers,
                     timeout=aiohttp.ClientTimeout(total=15),
                 ) as response:
                     if response.status == 429 and attempt < 3:
-                        pass 
+                        concurrency.note_throttled("kalshi")
                     else:
                         response.raise_for_status()
                         return await response.json()
@@ -159,6 +209,14 @@ class KalshiService:
         data = await self._kalshi_get(path, f"{KALSHI_BASE_URL}/markets", params)
         return data.get("markets", [])
 
+    async def get_markets_by_tickers(self, tickers: list[str]) -> list[dict]:
+        if not tickers:
+            return []
+        path = "/trade-api/v2/markets"
+        params = {"tickers": ",".join(tickers), "limit": len(tickers)}
+        data = await self._kalshi_get(path, f"{KALSHI_BASE_URL}/markets", params)
+        return data.get("markets", [])
+
     async def get_market(self, ticker: str) -> dict:
         path = f"/trade-api/v2/markets/{ticker}"
         data = await self._kalshi_get(path, f"{KALSHI_BASE_URL}/markets/{ticker}")
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import re
+import time
+from typing import Optional
+from services.firestore_service import FirestoreService
+from utils.env import settings
+from utils.veo_prompt_builder import PROMPT_VERSION
+
+# a render that hasn't finished by now is treated as abandoned (crashed instance etc.)
+_CLAIM_STALE_SECONDS = 900.0
+_REMOTE_POLL_SECONDS = 10.0
+DONE = "done"
+RENDERING = "rendering"
+CLAIMED = "claimed"
+
+
+def _normalize(text: Optional[str]) -> str:
+    return re.sub(r"[^\w%$.]+", " ", (text or "").lower()).strip()
+
+
+def render_key(title: str, outcome: str, trade_side: Optional[str]) -> str:
+    raw = "|".join([_normalize(title), _normalize(outcome), _normalize(trade_side), f"v{PROMPT_VERSION}"])
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+# completed renders keyed by what went into the prompt, so the same trade asked for twice
+# shares one veo render. in-flight renders are claimed so later jobs attach instead
+class RenderIndexService:
+    def __init__(self, firestore_service: FirestoreService) -> None:
+        self.firestore_service = firestore_service
+        self.enabled = settings.RENDER_REUSE_ENABLED
+        self.max_age_hours = settings.RENDER_REUSE_MAX_AGE_HOURS
+        # renders owned by jobs on this instance; followers here skip firestore polling
+        self._local: dict[str, asyncio.Future] = {}
+        self.lookups = 0
+        self.reused = 0
+        self.attached = 0
+        self.attach_fallbacks = 0
+        self.rendered = 0
+        self.released = 0
+
+    def _fresh(self, entry: Optional[dict]) -> bool:
+        if not entry or entry.get("status") != DONE or not entry.get("video_uri"):
+            return False
+        completed_at = entry.get("completed_at")
+        return bool(completed_at) and time.time() - completed_at.timestamp() < self.max_age_hours * 3600
+
+    async def find_completed(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        self.lookups += 1
+        try:
+            entry = await self.firestore_service.get_render(key)
+        except Exception as e:
+            print(f"[render-index] Lookup failed for {key[:8]}: {e}")
+            return None
+        return entry if self._fresh(entry) else None
+
+    async def claim(self, key: str, job_id: str) -> tuple[str, Optional[dict]]:
+        if not self.enabled:
+            return CLAIMED, None
+        try:
+            entry = await self.firestore_service.claim_render(
+                key, job_id, _CLAIM_STALE_SECONDS, self.max_age_hours
+            )
+        except Exception as e:
+            # index trouble shouldn't block the job; just render without sharing
+            print(f"[render-index] Claim failed for {key[:8]}: {e}")
+            return CLAIMED, None
+        if entry is None:
+            self._local.setdefault(key, asyncio.get_running_loop().create_future())
+            return CLAIMED, None
+        return (DONE if entry.get("status") == DONE else RENDERING), entry
+
+    async def wait_for(self, key: str, owner_job_id: str) -> Optional[dict]:
+        self.attached += 1
+        local = self._local.get(key)
+        if local is not None:
+            entry = await asyncio.shield(local)
+        else:
+            entry = await self._poll_remote(key, owner_job_id)
+        if entry is None:
+            self.attach_fallbacks += 1
+        return entry
+
+    async def _poll_remote(self, key: str, owner_job_id: str) -> Optional[dict]:
+        deadline = time.monotonic() + _CLAIM_STALE_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_REMOTE_POLL_SECONDS)
+            try:
+                entry = await self.firestore_service.get_render(key)
+            except Exception as e:
+                print(f"[render-index] Poll failed for {key[:8]}: {e}")
+                continue
+            if entry and entry.get("status") == DONE:
+                return entry
+            # released after a failure, or taken over by someone else
+            if not entry or entry.get("job_id") != owner_job_id:
+                return None
+        return None
+
+    async def complete(self, key: str, job_id: str, video_uri: str, video_url: Optional[str]) -> None:
+        if not self.enabled:
+            return
+        self.rendered += 1
+        entry = {"job_id": job_id, "video_uri": video_uri, "video_url": video_url, "reused": 0}
+        try:
+            await self.firestore_service.complete_render(key, entry)
+        except Exception as e:
+            print(f"[render-index] Failed to record render {key[:8]}: {e}")
+        local = self._local.pop(key, None)
+        if local is not None and not local.done():
+            local.set_result({**entry, "status": DONE})
+
+    async def release(self, key: str, job_id: str) -> None:
+        if not self.enabled:
+            return
+        self.released += 1
+        local = self._local.pop(key, None)
+        if local is not None and not local.done():
+            local.set_result(None)
+        try:
+            await self.firestore_service.release_render(key, job_id)
+        except Exception as e:
+            print(f"[render-index] Failed to release {key[:8]}: {e}")
+
+    async def note_reused(self, key: str) -> None:
+        self.reused += 1
+        try:
+            await self.firestore_service.count_render_reuse(key)
+        except Exception as e:
+            print(f"[render-index] Failed to count reuse of {key[:8]}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "prompt_version": PROMPT_VERSION,
+            "lookups": self.lookups,
+            "reused": self.reused,
+            "attached": self.attached,
+            "attach_fallbacks": self.attach_fallbacks,
+            "rendered": self.rendered,
+            "released": self.released,
+            "local_in_flight": len(self._local),
+        }
@@ -0,0 +1,183 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import traceback
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from services.firestore_service import FirestoreService
+from utils.env import settings
+
+# leases outlive a missed tick or two so a slow leader isn't preempted, but a dead one is
+_LEASE_INTERVALS = 1.5
+_MIN_LEASE_SECONDS = 120.0
+_HEARTBEAT_SECONDS = 60.0
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    interval: float
+    run: Callable[[], Awaitable[dict]]
+    running: bool = False
+    runs: int = 0
+    failures: int = 0
+    skipped_overlap: int = 0
+    skipped_not_leader: int = 0
+    lease_lost: int = 0
+    last_started_at: Optional[datetime] = None
+    last_duration_s: Optional[float] = None
+    last_status: str = ""
+    last_result: dict = field(default_factory=dict)
+    next_run_at: Optional[datetime] = None
+
+    @property
+    def lease_ttl(self) -> float:
+        return max(_MIN_LEASE_SECONDS, self.interval * _LEASE_INTERVALS)
+
+
+# in-process timer for pool upkeep. every instance runs the timers, but each job only
+# executes on whichever instance holds its firestore lease
+class SchedulerService:
+    def __init__(self, firestore_service: FirestoreService) -> None:
+        self.firestore_service = firestore_service
+        self.instance_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.jitter = settings.SCHEDULER_JITTER
+        self.jobs: dict[str, ScheduledJob] = {}
+        self._loops: list[asyncio.Task] = []
+        self._runs: set[asyncio.Task] = set()
+
+    def add_job(self, name: str, interval: float, run: Callable[[], Awaitable[dict]]) -> None:
+        self.jobs[name] = ScheduledJob(name=name, interval=interval, run=run)
+
+    def start(self) -> None:
+        if self._loops:
+            return
+        for job in self.jobs.values():
+            self._loops.append(asyncio.create_task(self._loop(job)))
+        print(f"[scheduler] Started {len(self.jobs)} jobs on {self.instance_id}")
+
+    async def stop(self) -> None:
+        for task in self._loops:
+            task.cancel()
+        self._loops.clear()
+        for job in self.jobs.values():
+            try:
+                await self.firestore_service.release_lease(job.name, self.instance_id)
+            except Exception as e:
+                print(f"[scheduler] Failed to release {job.name} lease: {e}")
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def _loop(self, job: ScheduledJob) -> None:
+        # stagger first runs so instances that boot together don't all hit the lease at once
+        first_delay = random.uniform(5.0, 5.0 + job.interval * self.jitter)
+        job.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=first_delay)
+        await asyncio.sleep(first_delay)
+        while True:
+            # fire and keep ticking; a run that outlasts the interval makes the next tick skip
+            task = asyncio.create_task(self.run_job(job.name))
+            self._runs.add(task)
+            task.add_done_callback(self._runs.discard)
+            delay = self._jittered(job.interval)
+            job.next_run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+
+    async def _heartbeat(self, job: ScheduledJob, run: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(min(_HEARTBEAT_SECONDS, job.lease_ttl / 3))
+            try:
+                held = await self.firestore_service.try_acquire_lease(job.name, self.instance_id, job.lease_ttl)
+            except Exception as e:
+                print(f"[scheduler] {job.name} lease heartbeat failed: {e}")
+                continue
+            if not held:
+                # another instance took the lease, so it may already be running this job too
+                job.lease_lost += 1
+                print(f"[scheduler] {job.name}: lease lost to another instance, cancelling run")
+                run.cancel()
+                return
+
+    async def run_job(self, name: str) -> dict:
+        job = self.jobs[name]
+        if job.running:
+            job.skipped_overlap += 1
+            print(f"[scheduler] {name}: previous run still going, skipping")
+            return {"status": "skipped", "reason": "running"}
+        job.running = True
+        try:
+            try:
+                leader = await self.firestore_service.try_acquire_lease(name, self.instance_id, job.lease_ttl)
+            except Exception as e:
+                print(f"[scheduler] {name}: lease check failed, skipping: {e}")
+                leader = False
+            if not leader:
+                job.skipped_not_leader += 1
+                return {"status": "skipped", "reason": "not_leader"}
+            return await self._execute(job)
+        finally:
+            job.running = False
+
+    async def _execute(self, job: ScheduledJob) -> dict:
+        job.last_started_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        run = asyncio.create_task(job.run())
+        heartbeat = asyncio.create_task(self._heartbeat(job, run))
+        try:
+            job.last_result = await run or {}
+            job.last_status = "ok"
+        except asyncio.CancelledError:
+            # only swallow the cancel the heartbeat issued; a scheduler shutdown still propagates
+            if not heartbeat.done() or heartbeat.cancelled():
+                raise
+            job.last_status = "lost"
+            job.last_result = {"error": "lease lost"}
+        except Exception as e:
+            job.failures += 1
+            job.last_status = "error"
+            job.last_result = {"error": str(e)}
+            print(f"[scheduler] {job.name} failed: {e}")
+            traceback.print_exc()
+        finally:
+            heartbeat.cancel()
+            job.runs += 1
+            job.last_duration_s = round(time.monotonic() - started, 2)
+        print(f"[scheduler] {job.name} {job.last_status} in {job.last_duration_s}s")
+        try:
+            await self.firestore_service.record_job_run(job.name, {
+                "holder": self.instance_id,
+                "started_at": job.last_started_at,
+                "finished_at": datetime.now(timezone.utc),
+                "duration_s": job.last_duration_s,
+                "status": job.last_status,
+                "result": job.last_result,
+            })
+        except Exception as e:
+            print(f"[scheduler] Failed to record {job.name} run: {e}")
+        return {"status": job.last_status, "duration_s": job.last_duration_s, **job.last_result}
+
+    def status(self) -> dict:
+        return {
+            "enabled": settings.SCHEDULER_ENABLED,
+            "instance": self.instance_id,
+            "jobs": {
+                job.name: {
+                    "interval_s": job.interval,
+                    "running": job.running,
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "skipped_overlap": job.skipped_overlap,
+                    "skipped_not_leader": job.skipped_not_leader,
+                    "lease_lost": job.lease_lost,
+                    "last_started_at": job.last_started_at.isoformat() if job.last_started_at else None,
+                    "last_duration_s": job.last_duration_s,
+                    "last_status": job.last_status,
+                    "next_run_at": job.next_run_at.isoformat() if job.next_run_at else None,
+                }
+                for job in self.jobs.values()
+            },
+        }
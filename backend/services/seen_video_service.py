@@ -0,0 +1,159 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from services.firestore_service import FirestoreService
+from utils.bloom import BloomFilter
+from utils.env import settings
+
+ADDED = "added"
+NO_MATCH = "no_match"
+NOT_EMBEDDABLE = "not_embeddable"
+PURGED = "purged"
+
+_ERROR_RATE = 0.01
+_CHECKPOINT_DELAY = 30.0
+
+
+# every video id the crawler has ever processed. the bloom filter answers "definitely new"
+# without a read; positives are confirmed against seen_videos before we skip anything
+class SeenVideoService:
+    def __init__(self, firestore_service: FirestoreService) -> None:
+        self.firestore_service = firestore_service
+        self.bloom = BloomFilter(settings.SEEN_REGISTRY_CAPACITY, _ERROR_RATE)
+        self.no_match_retry = timedelta(hours=settings.SEEN_NO_MATCH_RETRY_HOURS)
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._dirty = False
+        self._checkpoint_task: asyncio.Task | None = None
+        self.checked = 0
+        self.bloom_negatives = 0
+        self.confirmed = 0
+        self.false_positives = 0
+        self.retried = 0
+        self.recorded: dict[str, int] = {}
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            started = time.monotonic()
+            try:
+                checkpoint = await self.firestore_service.get_seen_checkpoint()
+                if checkpoint and checkpoint.get("capacity") == self.bloom.capacity:
+                    self.bloom.union(BloomFilter.from_bytes(
+                        checkpoint["bits"], self.bloom.capacity, _ERROR_RATE, checkpoint.get("count", 0)
+                    ))
+                    source = "checkpoint"
+                else:
+                    # first run (or capacity changed): rebuild from the exact records, backfilling
+                    # records for pool items crawled before the registry existed
+                    ids = await self.firestore_service.list_seen_video_ids()
+                    known = set(ids)
+                    backfill = {
+                        vid: ADDED for vid in await self.firestore_service.list_feed_video_ids()
+                        if vid not in known
+                    }
+                    await self.firestore_service.record_seen_videos(backfill)
+                    for vid in [*ids, *backfill]:
+                        self.bloom.add(vid)
+                    self._dirty = True
+                    source = f"rebuild of {len(ids) + len(backfill)} ids, {len(backfill)} backfilled"
+                print(f"[seen] Loaded registry ({source}, ~{self.bloom.count} ids) in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                # an empty filter only costs us confirmation reads, never wrong skips
+                print(f"[seen] Failed to load registry, starting empty: {e}")
+            self._loaded = True
+
+    async def filter_unseen(self, video_ids: list[str]) -> list[str]:
+        await self._ensure_loaded()
+        video_ids = list(dict.fromkeys(video_ids))
+        self.checked += len(video_ids)
+        maybe_seen = [vid for vid in video_ids if vid in self.bloom]
+        self.bloom_negatives += len(video_ids) - len(maybe_seen)
+        if not maybe_seen:
+            return video_ids
+
+        try:
+            records = await self.firestore_service.get_seen_videos(maybe_seen)
+        except Exception as e:
+            # can't confirm: treat positives as seen rather than pay for them again
+            print(f"[seen] Confirmation read failed for {len(maybe_seen)} ids: {e}")
+            skip = set(maybe_seen)
+            return [vid for vid in video_ids if vid not in skip]
+
+        now = datetime.now(timezone.utc)
+        skip = set()
+        for vid in maybe_seen:
+            record = records.get(vid)
+            if record is None:
+                self.false_positives += 1
+                continue
+            seen_at = record.get("seen_at")
+            if record.get("outcome") == NO_MATCH and seen_at and now - seen_at > self.no_match_retry:
+                # kalshi lists new markets all the time; give old misses another chance
+                self.retried += 1
+                continue
+            skip.add(vid)
+            self.confirmed += 1
+        return [vid for vid in video_ids if vid not in skip]
+
+    async def record(self, outcomes: dict[str, str]) -> None:
+        if not outcomes:
+            return
+        await self._ensure_loaded()
+        for vid, outcome in outcomes.items():
+            self.bloom.add(vid)
+            self.recorded[outcome] = self.recorded.get(outcome, 0) + 1
+        try:
+            await self.firestore_service.record_seen_videos(outcomes)
+        except Exception as e:
+            print(f"[seen] Failed to record {len(outcomes)} outcomes: {e}")
+        self._dirty = True
+        self._schedule_checkpoint()
+
+    def _schedule_checkpoint(self) -> None:
+        if self._checkpoint_task is None or self._checkpoint_task.done():
+            self._checkpoint_task = asyncio.create_task(self._delayed_checkpoint())
+
+    async def _delayed_checkpoint(self) -> None:
+        await asyncio.sleep(_CHECKPOINT_DELAY)
+        await self.checkpoint()
+
+    async def checkpoint(self) -> None:
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            # other instances checkpoint too; OR their bits in so nobody's adds are lost
+            stored = await self.firestore_service.get_seen_checkpoint()
+            if stored and stored.get("capacity") == self.bloom.capacity:
+                self.bloom.union(BloomFilter.from_bytes(
+                    stored["bits"], self.bloom.capacity, _ERROR_RATE, stored.get("count", 0)
+                ))
+            await self.firestore_service.save_seen_checkpoint({
+                "bits": self.bloom.to_bytes(),
+                "capacity": self.bloom.capacity,
+                "error_rate": _ERROR_RATE,
+                "count": self.bloom.count,
+            })
+        except Exception as e:
+            self._dirty = True
+            print(f"[seen] Checkpoint failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "approx_ids": self.bloom.count,
+            "capacity": self.bloom.capacity,
+            "fill_ratio": round(self.bloom.fill_ratio(), 4),
+            "estimated_fp_rate": round(self.bloom.estimated_error_rate(), 5),
+            "checked": self.checked,
+            "bloom_negatives": self.bloom_negatives,
+            "confirmed_seen": self.confirmed,
+            "false_positives": self.false_positives,
+            "no_match_retried": self.retried,
+            "recorded": dict(self.recorded),
+            "dirty": self._dirty,
+        }
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+from models.job import JobStatus
+from services.vertex_service import VertexService
+
+# prior until we've watched a few renders ourselves (veo 720p/8s is usually 60-120s)
+_DEFAULT_RENDER_SECONDS = [60.0, 75.0, 90.0, 105.0, 120.0]
+_MIN_SAMPLES = 5
+_HISTORY = 200
+_MIN_INTERVAL = 3.0
+_MAX_INTERVAL = 30.0
+_MAX_CHECKS_IN_FLIGHT = 8
+_MAX_STATUS_ERRORS = 5
+_TIMEOUT_FLOOR = 300.0
+
+
+@dataclass
+class _Operation:
+    name: str
+    future: asyncio.Future
+    submitted_at: float
+    next_check_at: float
+    checks: int = 0
+    status_errors: int = 0
+    late_checks: int = 0
+    label: str = ""
+
+
+def _percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+# one loop polls every in-flight veo operation. checks are scheduled off the observed
+# render-time distribution: nothing before the fast renders finish, dense around the
+# median, then backing off again for stragglers
+class VeoPollerService:
+    def __init__(self, vertex_service: VertexService) -> None:
+        self.vertex_service = vertex_service
+        self._ops: dict[str, _Operation] = {}
+        self._render_times: deque[float] = deque(maxlen=_HISTORY)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.checks = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.checks_per_op: deque[int] = deque(maxlen=_HISTORY)
+
+    def _distribution(self) -> tuple[float, float, float]:
+        samples = list(self._render_times) if len(self._render_times) >= _MIN_SAMPLES else _DEFAULT_RENDER_SECONDS
+        return _percentile(samples, 0.1), _percentile(samples, 0.5), _percentile(samples, 0.9)
+
+    def _timeout(self) -> float:
+        return max(_TIMEOUT_FLOOR, 3 * self._distribution()[2])
+
+    def _next_delay(self, op: _Operation, now: float) -> float:
+        p10, p50, p90 = self._distribution()
+        age = now - op.submitted_at
+        if age < p10:
+            return max(_MIN_INTERVAL, p10 - age)
+        if age < p90:
+            # tightest right around the median, where most renders land
+            spread = max(p90 - p10, 1.0)
+            closeness = 1 - min(1.0, abs(age - p50) / spread)
+            return max(_MIN_INTERVAL, (1 - closeness) * spread / 4)
+        op.late_checks += 1
+        return min(_MAX_INTERVAL, _MIN_INTERVAL * 1.5 ** op.late_checks)
+
+    def track(self, operation_name: str, label: str = "") -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        op = _Operation(
+            name=operation_name,
+            future=loop.create_future(),
+            submitted_at=now,
+            next_check_at=now,
+            label=label,
+        )
+        op.next_check_at = now + self._next_delay(op, now)
+        self._ops[operation_name] = op
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return op.future
+
+    async def wait(self, operation_name: str, label: str = "") -> tuple[str, Optional[str]]:
+        status: JobStatus = await self.track(operation_name, label)
+        if status.status == "done":
+            return "done", status.video_url
+        return "error", status.error or "Unknown Veo error"
+
+    async def _run(self) -> None:
+        semaphore = asyncio.Semaphore(_MAX_CHECKS_IN_FLIGHT)
+        while self._ops:
+            now = time.monotonic()
+            # callers that gave up (cancelled) don't need polling any more
+            for name in [n for n, op in self._ops.items() if op.future.done()]:
+                del self._ops[name]
+            due = [op for op in self._ops.values() if op.next_check_at <= now]
+            if due:
+                await asyncio.gather(*[self._check(op, semaphore) for op in due])
+                continue
+            if not self._ops:
+                break
+            self._wakeup.clear()
+            sleep_for = min(op.next_check_at for op in self._ops.values()) - now
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _check(self, op: _Operation, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            op.checks += 1
+            self.checks += 1
+            try:
+                result = await self.vertex_service.get_video_status_by_name(op.name)
+            except Exception as e:
+                op.status_errors += 1
+                print(f"[veo-poller] {op.label or op.name}: status check failed ({op.status_errors}): {e}", flush=True)
+                if op.status_errors >= _MAX_STATUS_ERRORS:
+                    self._finish(op, JobStatus(status="error", error=f"Veo status checks failing: {e}"))
+                else:
+                    op.next_check_at = time.monotonic() + _MIN_INTERVAL * 2 ** op.status_errors
+                return
+
+        now = time.monotonic()
+        age = now - op.submitted_at
+        if result.status == "done":
+            self._render_times.append(age)
+            self.completed += 1
+            self._finish(op, result)
+        elif result.status == "error":
+            self.failed += 1
+            self._finish(op, result)
+        elif age > self._timeout():
+            self.timeouts += 1
+            self._finish(op, JobStatus(status="error", error=f"Veo timed out after {int(age)} seconds"))
+        else:
+            op.next_check_at = now + self._next_delay(op, now)
+            return
+        print(f"[veo-poller] {op.label or op.name}: {result.status} after {age:.0f}s, {op.checks} checks", flush=True)
+
+    def _finish(self, op: _Operation, status: JobStatus) -> None:
+        self._ops.pop(op.name, None)
+        self.checks_per_op.append(op.checks)
+        if not op.future.done():
+            op.future.set_result(status)
+
+    def stats(self) -> dict:
+        p10, p50, p90 = self._distribution()
+        now = time.monotonic()
+        return {
+            "in_flight": len(self._ops),
+            "oldest_s": round(max((now - op.submitted_at for op in self._ops.values()), default=0.0), 1),
+            "render_p10_s": round(p10, 1),
+            "render_p50_s": round(p50, 1),
+            "render_p90_s": round(p90, 1),
+            "samples": len(self._render_times),
+            "checks": self.checks,
+            "avg_checks_per_job": (
+                round(sum(self.checks_per_op) / len(self.checks_per_op), 1) if self.checks_per_op else 0.0
+            ),
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+        }
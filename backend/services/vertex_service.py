@@ -1,4 +1,11 @@
+import asyncio
+import io
 import logging
+import random
+import time
+import uuid
+from collections import deque
+from typing import Optional, Protocol
 from google import genai
 from google.genai.types import (
     GenerateImagesConfig,
@@ -10,6 +17,8 @@ from models.job import JobStatus
 from utils.env import settings
 
 logger = logging.getLogger("vertex_service")
+IMAGEN_MODEL = "imagen-3.0-generate-002"
+VEO_MODEL = "veo-3.1-generate-preview"
 
 def _infer_mime_type(image_bytes: bytes) -> str:
     if image_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
@@ -21,31 +30,209 @@ def _infer_mime_type(image_bytes: bytes) -> str:
     return "image/png"
 
 
-class VertexService:
-    def __init__(self):
-        logger.info(f"Initializing VertexService for project={settings.GOOGLE_CLOUD_PROJECT}, location={settings.GOOGLE_CLOUD_LOCATION}")
+class VertexBackend(Protocol):
+    async def generate_image(self, prompt: str) -> Optional[bytes]: ...
+
+    async def generate_video(self, prompt: str, image_data: bytes, config: GenerateVideosConfig) -> GenerateVideosOperation: ...
+
+    async def get_video_status(self, operation_name: str) -> JobStatus: ...
+
+
+# google-genai's async surface (client.aio) so vertex round trips never block the loop
+class GenaiVertexBackend:
+    def __init__(self) -> None:
         self.client = genai.Client(
             vertexai=True,
             project=settings.GOOGLE_CLOUD_PROJECT,
             location=settings.GOOGLE_CLOUD_LOCATION
         )
+
+    async def generate_image(self, prompt: str) -> Optional[bytes]:
+        response = await self.client.aio.models.generate_images(
+            model=IMAGEN_MODEL,
+            prompt=prompt,
+            config=GenerateImagesConfig(
+                number_of_images=1,
+                aspect_ratio="9:16",
+                output_mime_type="image/png",
+            ),
+        )
+        if response.generated_images:
+            return response.generated_images[0].image.image_bytes
+        return None
+
+    async def generate_video(self, prompt: str, image_data: bytes, config: GenerateVideosConfig) -> GenerateVideosOperation:
+        return await self.client.aio.models.generate_videos(
+            model=VEO_MODEL,
+            prompt=prompt,
+            image=Image(
+                image_bytes=image_data,
+                mime_type=_infer_mime_type(image_data),
+            ),
+            config=config,
+        )
+
+    async def get_video_status(self, operation_name: str) -> JobStatus:
+        operation = await self.client.aio.operations.get(GenerateVideosOperation(name=operation_name))
+        logger.debug(f"get_video_status_by_name: done={operation.done}")
+
+        if operation.done:
+            logger.info(f"get_video_status_by_name: Operation DONE!")
+
+            if hasattr(operation, 'error') and operation.error:
+                error_msg = str(operation.error)
+                logger.error(f"get_video_status_by_name: Operation FAILED with error: {error_msg}")
+                return JobStatus(status="error", job_start_time=None, video_url=None, error=f"Veo error: {error_msg}")
+
+            if operation.result:
+                logger.debug(f"get_video_status_by_name: result exists")
+                if operation.result.generated_videos:
+                    video_count = len(operation.result.generated_videos)
+                    logger.info(f"get_video_status_by_name: {video_count} video(s) generated")
+                    video_uri = operation.result.generated_videos[0].video.uri
+                    logger.info(f"get_video_status_by_name: Video URI from Veo: {video_uri}")
+                    return JobStatus(status="done", job_start_time=None, video_url=video_uri)
+                else:
+                    logger.warning(f"get_video_status_by_name: No generated_videos in result!")
+                    return JobStatus(status="error", job_start_time=None, video_url=None, error="Veo completed but no video generated")
+            else:
+                logger.warning(f"get_video_status_by_name: No result in operation!")
+                return JobStatus(status="error", job_start_time=None, video_url=None, error="Veo completed but no result returned")
+
+        logger.debug(f"get_video_status_by_name: Still processing...")
+        return JobStatus(status="waiting", job_start_time=None, video_url=None)
+
+
+# offline stand-in: fixed call latency, renders that finish after a randomized delay
+class FakeVertexBackend:
+    def __init__(self, latency: float = 0.3, render_seconds: float = 90.0, error_rate: float = 0.0) -> None:
+        self.latency = latency
+        self.render_seconds = render_seconds
+        self.error_rate = error_rate
+        self.calls = 0
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self._operations: dict[str, tuple[float, float, bool]] = {}
+
+    async def _call(self) -> None:
+        self.calls += 1
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.concurrent -= 1
+
+    @staticmethod
+    def _render_png(prompt: str) -> bytes:
+        from PIL import Image as PILImage
+
+        out = io.BytesIO()
+        shade = sum(prompt.encode()) % 200
+        PILImage.new("RGB", (768, 1408), (shade, 80, 200 - shade)).save(out, format="PNG")
+        return out.getvalue()
+
+    async def generate_image(self, prompt: str) -> Optional[bytes]:
+        await self._call()
+        return await asyncio.to_thread(self._render_png, prompt)
+
+    async def generate_video(self, prompt: str, image_data: bytes, config: GenerateVideosConfig) -> GenerateVideosOperation:
+        await self._call()
+        name = f"projects/fake/locations/us-central1/operations/{uuid.uuid4().hex}"
+        duration = self.render_seconds * random.uniform(0.7, 1.3)
+        self._operations[name] = (time.monotonic(), duration, random.random() < self.error_rate)
+        return GenerateVideosOperation(name=name)
+
+    async def get_video_status(self, operation_name: str) -> JobStatus:
+        await self._call()
+        started, duration, fails = self._operations[operation_name]
+        if time.monotonic() - started < duration:
+            return JobStatus(status="waiting")
+        if fails:
+            return JobStatus(status="error", error="Veo error: fake render failure")
+        bucket = settings.GOOGLE_CLOUD_BUCKET_NAME or "fake-bucket"
+        return JobStatus(status="done", video_url=f"gs://{bucket}/videos/{operation_name.rsplit('/', 1)[-1]}.mp4")
+
+
+# we stopped waiting on a veo submit, but vertex may have created the operation anyway and
+# keeps rendering (and billing) it with nobody polling. every submit writes under its own
+# request id, so the orphan's output can be found by prefix and reconciled
+class VeoSubmitTimeout(TimeoutError):
+    def __init__(self, request_id: str, output_gcs_uri: str, timeout: float) -> None:
+        super().__init__(
+            f"Veo submit timed out after {timeout:.0f}s; the render may still land in "
+            f"{output_gcs_uri} (request {request_id})"
+        )
+        self.request_id = request_id
+        self.output_gcs_uri = output_gcs_uri
+
+
+class _CallStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latencies: deque[float] = deque(maxlen=500)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "latency_p50_ms": pct(0.5),
+            "latency_p95_ms": pct(0.95),
+            "latency_max_ms": round(1000 * ordered[-1], 1) if ordered else 0.0,
+        }
+
+
+def _build_backend() -> VertexBackend:
+    if settings.VERTEX_BACKEND == "fake":
+        print("[vertex] Using fake Vertex backend", flush=True)
+        return FakeVertexBackend(
+            latency=settings.VERTEX_FAKE_LATENCY_MS / 1000,
+            render_seconds=settings.VERTEX_FAKE_RENDER_SECONDS,
+        )
+    return GenaiVertexBackend()
+
+
+class VertexService:
+    def __init__(self):
+        logger.info(f"Initializing VertexService for project={settings.GOOGLE_CLOUD_PROJECT}, location={settings.GOOGLE_CLOUD_LOCATION}")
+        self.backend: VertexBackend = _build_backend()
         self.bucket_name = settings.GOOGLE_CLOUD_BUCKET_NAME
+        self._stats = {name: _CallStats() for name in ("imagen", "veo_submit", "veo_status")}
+        self.unconfirmed_submits: deque[dict] = deque(maxlen=50)
         logger.info(f"VertexService initialized, output bucket: {self.bucket_name}")
 
+    async def _timed(self, name: str, timeout: float, call):
+        stats = self._stats[name]
+        stats.calls += 1
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(call, timeout=timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise TimeoutError(f"Vertex {name} call timed out after {timeout:.0f}s")
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.latencies.append(time.monotonic() - started)
+
     async def generate_starting_frame(self, prompt: str) -> bytes | None:
         logger.info("Generating starting frame via Imagen...")
         try:
-            response = self.client.models.generate_images(
-                model="imagen-3.0-generate-002",
-                prompt=prompt,
-                config=GenerateImagesConfig(
-                    number_of_images=1,
-                    aspect_ratio="9:16",
-                    output_mime_type="image/png",
-                ),
+            image_bytes = await self._timed(
+                "imagen", settings.VERTEX_IMAGEN_TIMEOUT, self.backend.generate_image(prompt)
             )
-            if response.generated_images:
-                image_bytes = response.generated_images[0].image.image_bytes
+            if image_bytes:
                 logger.info(f"Starting frame generated ({len(image_bytes)} bytes)")
                 return image_bytes
             logger.warning("Imagen returned no images")
@@ -58,7 +245,8 @@ class VertexService:
         prompt: str,
         image_data: bytes | None,
     ) -> GenerateVideosOperation:
-        output_gcs_uri = f"gs://{self.bucket_name}/videos/"
+        request_id = uuid.uuid4().hex
+        output_gcs_uri = f"gs://{self.bucket_name}/videos/{request_id}/"
         if image_data is None:
             raise ValueError("image_data is required for video generation")
         config_kwargs = {
@@ -82,46 +270,29 @@ class VertexService:
             config_kwargs.pop("resolution", None)
             config = GenerateVideosConfig(**config_kwargs)
 
-        image_mime = _infer_mime_type(image_data)
-        operation = self.client.models.generate_videos(
-            model="veo-3.1-generate-preview",
-            prompt=prompt,
-            image=Image(
-                image_bytes=image_data,
-                mime_type=image_mime,
-            ),
-            config=config,
-        )
-        return operation
+        logger.info(f"Submitting Veo request {request_id} -> {output_gcs_uri}")
+        try:
+            return await self._timed(
+                "veo_submit", settings.VERTEX_SUBMIT_TIMEOUT, self.backend.generate_video(prompt, image_data, config)
+            )
+        except TimeoutError as exc:
+            logger.error(f"Veo submit {request_id} timed out; operation may exist, output prefix {output_gcs_uri}")
+            self.unconfirmed_submits.append({
+                "request_id": request_id,
+                "output_gcs_uri": output_gcs_uri,
+                "at": time.time(),
+            })
+            raise VeoSubmitTimeout(request_id, output_gcs_uri, settings.VERTEX_SUBMIT_TIMEOUT) from exc
 
     async def get_video_status_by_name(self, operation_name: str) -> JobStatus:
         logger.debug(f"get_video_status_by_name: Polling operation {operation_name}")
-        operation = GenerateVideosOperation(name=operation_name)
-        operation = self.client.operations.get(operation)
-        logger.debug(f"get_video_status_by_name: done={operation.done}")
-
-        if operation.done:
-            logger.info(f"get_video_status_by_name: Operation DONE!")
-
-            if hasattr(operation, 'error') and operation.error:
-                error_msg = str(operation.error)
-                logger.error(f"get_video_status_by_name: Operation FAILED with error: {error_msg}")
-                return JobStatus(status="error", job_start_time=None, video_url=None, error=f"Veo error: {error_msg}")
-
-            if operation.result:
-                logger.debug(f"get_video_status_by_name: result exists")
-                if operation.result.generated_videos:
-                    video_count = len(operation.result.generated_videos)
-                    logger.info(f"get_video_status_by_name: {video_count} video(s) generated")
-                    video_uri = operation.result.generated_videos[0].video.uri
-                    logger.info(f"get_video_status_by_name: Video URI from Veo: {video_uri}")
-                    return JobStatus(status="done", job_start_time=None, video_url=video_uri)
-                else:
-                    logger.warning(f"get_video_status_by_name: No generated_videos in result!")
-                    return JobStatus(status="error", job_start_time=None, video_url=None, error="Veo completed but no video generated")
-            else:
-                logger.warning(f"get_video_status_by_name: No result in operation!")
-                return JobStatus(status="error", job_start_time=None, video_url=None, error="Veo completed but no result returned")
+        return await self._timed(
+            "veo_status", settings.VERTEX_STATUS_TIMEOUT, self.backend.get_video_status(operation_name)
+        )
 
-        logger.debug(f"get_video_status_by_name: Still processing...")
-        return JobStatus(status="waiting", job_start_time=None, video_url=None)
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "calls": {name: s.snapshot() for name, s in self._stats.items()},
+            "unconfirmed_submits": list(self.unconfirmed_submits),
+        }
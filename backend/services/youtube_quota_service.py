@@ -0,0 +1,115 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from services.firestore_service import FirestoreService
+from utils.env import settings
+
+# YouTube Data API v3 unit costs
+QUOTA_COSTS = {
+    "search": 100,
+    "videos": 1,
+    "channels": 1,
+}
+
+# quota resets at midnight Pacific, PDT included
+_PACIFIC = ZoneInfo("America/Los_Angeles")
+_SYNC_INTERVAL = 60.0
+
+# every search is followed by ~one videos.list (status) + one videos.list (snippet) + one channels.list
+SEARCH_RUN_COST = QUOTA_COSTS["search"] + 3
+
+
+class YoutubeQuotaService:
+    def __init__(self, firestore_service: FirestoreService) -> None:
+        self.firestore_service = firestore_service
+        self.daily_budget = settings.YOUTUBE_DAILY_QUOTA
+        self.reserve = settings.YOUTUBE_QUOTA_RESERVE
+        self.day = ""
+        self.used = 0
+        self.by_endpoint: dict[str, int] = {}
+        self._synced_at = 0.0
+        self._lock = asyncio.Lock()
+        self._pending_writes: set[asyncio.Task] = set()
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(_PACIFIC).strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _day_fraction_elapsed() -> float:
+        now = datetime.now(_PACIFIC)
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return (now - midnight).total_seconds() / 86400
+
+    async def _sync(self) -> None:
+        today = self._today()
+        if today == self.day and time.monotonic() - self._synced_at < _SYNC_INTERVAL:
+            return
+        async with self._lock:
+            today = self._today()
+            if today == self.day and time.monotonic() - self._synced_at < _SYNC_INTERVAL:
+                return
+            try:
+                stored = await self.firestore_service.get_youtube_quota(today)
+            except Exception as e:
+                print(f"[quota] Failed to load ledger for {today}: {e}")
+                stored = None
+            if today != self.day:
+                self.day = today
+                self.used = 0
+                self.by_endpoint = {}
+            if stored:
+                # other instances spend from the same budget; never go backwards locally
+                self.used = max(self.used, int(stored.get("used", 0)))
+                for endpoint, units in (stored.get("by_endpoint") or {}).items():
+                    self.by_endpoint[endpoint] = max(self.by_endpoint.get(endpoint, 0), int(units))
+            self._synced_at = time.monotonic()
+
+    async def charge(self, endpoint: str, calls: int = 1) -> int:
+        await self._sync()
+        units = QUOTA_COSTS.get(endpoint, 1) * calls
+        self.used += units
+        self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + units
+        task = asyncio.create_task(self._persist(self.day, endpoint, units))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+        return units
+
+    async def _persist(self, day: str, endpoint: str, units: int) -> None:
+        try:
+            await self.firestore_service.add_youtube_quota(day, endpoint, units)
+        except Exception as e:
+            print(f"[quota] Failed to persist {units} units for {endpoint}: {e}")
+
+    async def remaining(self) -> int:
+        await self._sync()
+        return max(0, self.daily_budget - self.used)
+
+    async def pace_allowance(self) -> int:
+        # spread spend over the day: what we may have used by now, plus a 10% burst
+        await self._sync()
+        paced = int(self.daily_budget * (self._day_fraction_elapsed() + 0.1))
+        return max(0, min(paced, self.daily_budget - self.reserve) - self.used)
+
+    async def plan_searches(self, wanted: int) -> int:
+        return max(0, min(wanted, await self.pace_allowance() // SEARCH_RUN_COST))
+
+    async def is_tight(self) -> bool:
+        # less than ~3 search runs of headroom on the pacing curve
+        return await self.pace_allowance() < 3 * SEARCH_RUN_COST
+
+    async def status(self) -> dict:
+        await self._sync()
+        now = datetime.now(_PACIFIC)
+        resets_at = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            "day": self.day,
+            "daily_budget": self.daily_budget,
+            "used": self.used,
+            "remaining": max(0, self.daily_budget - self.used),
+            "pace_allowance": await self.pace_allowance(),
+            "searches_available_now": await self.plan_searches(10_000),
+            "by_endpoint": dict(self.by_endpoint),
+            "resets_at": resets_at.astimezone(timezone.utc).isoformat(),
+        }
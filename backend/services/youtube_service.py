@@ -1,5 +1,10 @@
+import asyncio
 import ssl
 import aiohttp
+from typing import Optional
+from services.youtube_quota_service import YoutubeQuotaService
+from utils.async_cache import AsyncTTLCache
+from utils.concurrency import concurrency
 from utils.env import settings
 
 # Disable SSL verification for local dev (macOS Python SSL cert issue)
@@ -8,29 +13,100 @@ _ssl_context.check_hostname = False
 _ssl_context.verify_mode = ssl.CERT_NONE
 
 
+MAX_IDS_PER_REQUEST = 50
+
+# channel avatars rarely change and channels repeat heavily across shorts
+_channel_thumbnail_cache = AsyncTTLCache(max_entries=20000, ttl=7 * 24 * 3600.0)
+
+
+def _empty_metadata() -> dict:
+    return {
+        "title": "",
+        "description": "",
+        "channel": "",
+        "thumbnail": "",
+        "channel_thumbnail": "",
+        "embeddable": False,
+    }
+
+
 class YoutubeService:
-    def __init__(self) -> None:
+    def __init__(self, quota_service: YoutubeQuotaService) -> None:
         self.api_key = settings.YOUTUBE_API_KEY
+        self.quota_service = quota_service
         self._connector = aiohttp.TCPConnector(ssl=_ssl_context)
 
-    async def _get_channel_thumbnail(self, channel_id: str) -> str:
-        url = "https://www.googleapis.com/youtube/v3/channels"
-        params = {"part": "snippet", "id": channel_id, "key": self.api_key}
-        try:
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=_ssl_context)) as session:
-                async with session.get(url, params=params) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-            items = data.get("items", [])
-            if items:
-                thumbnails = items[0].get("snippet", {}).get("thumbnails", {})
-                return (
-                    thumbnails.get("default", {}).get("url", "")
-                    or thumbnails.get("medium", {}).get("url", "")
+    async def _api_get(self, endpoint: str, params: dict) -> dict:
+        # failed requests still cost quota, so charge up front
+        await self.quota_service.charge(endpoint)
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=_ssl_context)) as session:
+            async with concurrency.slot("youtube"), session.get(
+                f"{settings.YOUTUBE_API_URL}/{endpoint}", params={**params, "key": self.api_key}
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+
+    async def search_shorts(self, query: str, max_results: int = 10) -> list[str]:
+        video_ids, _ = await self.search_shorts_page(query, max_results=max_results)
+        return video_ids
+
+    async def search_shorts_page(
+        self,
+        query: str,
+        max_results: int = 10,
+        published_after: Optional[str] = None,
+        page_token: Optional[str] = None,
+    ) -> tuple[list[str], Optional[str]]:
+        params = {
+            "part": "id",
+            "q": query,
+            "type": "video",
+            "videoDuration": "short",
+            "videoEmbeddable": "true",
+            # incremental crawls walk uploads newest-first from the watermark
+            "order": "date" if published_after else "relevance",
+            "maxResults": min(max_results, 50),
+        }
+        if published_after:
+            params["publishedAfter"] = published_after
+        if page_token:
+            params["pageToken"] = page_token
+        data = await self._api_get("search", params)
+        video_ids = []
+        for item in data.get("items", []):
+            vid = item.get("id", {}).get("videoId")
+            if vid:
+                video_ids.append(vid)
+        return video_ids, data.get("nextPageToken")
+
+    async def _get_channel_thumbnails(self, channel_ids: list[str]) -> dict[str, str]:
+        unique_ids = list(dict.fromkeys(c for c in channel_ids if c))
+        thumbnails, missing = _channel_thumbnail_cache.get_many(unique_ids)
+
+        async def fetch(batch: list[str]) -> None:
+            try:
+                data = await self._api_get("channels", {"part": "snippet", "id": ",".join(batch)})
+            except Exception as e:
+                print(f"[channel_thumbnail] Failed to fetch {len(batch)} channels: {e}")
+                return
+            for item in data.get("items", []):
+                snippet_thumbs = item.get("snippet", {}).get("thumbnails", {})
+                url = (
+                    snippet_thumbs.get("default", {}).get("url", "")
+                    or snippet_thumbs.get("medium", {}).get("url", "")
                 )
-        except Exception as e:
-            print(f"[channel_thumbnail] Failed to fetch for {channel_id}: {e}")
-        return ""
+                thumbnails[item.get("id", "")] = url
+                _channel_thumbnail_cache.set(item.get("id", ""), url)
+
+        await asyncio.gather(*[
+            fetch(missing[i : i + MAX_IDS_PER_REQUEST])
+            for i in range(0, len(missing), MAX_IDS_PER_REQUEST)
+        ])
+        return thumbnails
+
+    async def _get_channel_thumbnail(self, channel_id: str) -> str:
+        thumbnails = await self._get_channel_thumbnails([channel_id])
+        return thumbnails.get(channel_id, "")
 
     async def batch_check_embeddable(self, video_ids: list[str]) -> list[str]:
         if not video_ids:
@@ -38,21 +114,10 @@ class YoutubeService:
 
         embeddable_ids: list[str] = []
         # YouTube API allows up to 50 IDs per request (bottleneck)
-        for i in range(0, len(video_ids), 50):
-            batch = video_ids[i : i + 50]
-            url = "https://www.googleapis.com/youtube/v3/videos"
-            params = {
-                "part": "status",
-                "id": ",".join(batch),
-                "key": self.api_key,
-            }
+        for i in range(0, len(video_ids), MAX_IDS_PER_REQUEST):
+            batch = video_ids[i : i + MAX_IDS_PER_REQUEST]
             try:
-                async with aiohttp.ClientSession(
-                    connector=aiohttp.TCPConnector(ssl=_ssl_context)
-                ) as session:
-                    async with session.get(url, params=params) as response:
-                        response.raise_for_status()
-                        data = await response.json()
+                data = await self._api_get("videos", {"part": "status", "id": ",".join(batch)})
 
                 for item in data.get("items", []):
                     video_id = item.get("id", "")
@@ -67,41 +132,44 @@ class YoutubeService:
 
         return embeddable_ids
 
-    async def get_video_metadata(self, video_id: str) -> dict:
-        url = "https://www.googleapis.com/youtube/v3/videos"
-        params = {"part": "snippet,status", "id": video_id, "key": self.api_key}
-        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=_ssl_context)) as session:
-            async with session.get(url, params=params) as response:
-                response.raise_for_status()
-                data = await response.json()
-
-        if not data.get("items"):
-            return {
-                "title": "",
-                "description": "",
-                "channel": "",
-                "thumbnail": "",
-                "channel_thumbnail": "",
-                "embeddable": False,
+    async def get_videos_metadata(self, video_ids: list[str]) -> dict[str, dict]:
+        unique_ids = list(dict.fromkeys(v for v in video_ids if v))
+        chunks = [
+            unique_ids[i : i + MAX_IDS_PER_REQUEST]
+            for i in range(0, len(unique_ids), MAX_IDS_PER_REQUEST)
+        ]
+        responses = await asyncio.gather(*[
+            self._api_get("videos", {"part": "snippet,status", "id": ",".join(chunk)})
+            for chunk in chunks
+        ])
+        items = [item for data in responses for item in data.get("items", [])]
+        channel_thumbnails = await self._get_channel_thumbnails(
+            [item.get("snippet", {}).get("channelId", "") for item in items]
+        )
+
+        metadata = {vid: _empty_metadata() for vid in unique_ids}
+        for item in items:
+            snippet = item["snippet"]
+            status = item.get("status", {})
+            metadata[item.get("id", "")] = {
+                "title": snippet.get("title", ""),
+                "tags": snippet.get("tags", []),
+                "category_id": snippet.get("categoryId", ""),
+                "description": snippet.get("description", "")[:500],
+                "channel": snippet.get("channelTitle", ""),
+                "thumbnail": (
+                    snippet.get("thumbnails", {}).get("maxres", {}).get("url")
+                    or snippet.get("thumbnails", {}).get("high", {}).get("url", "")
+                ),
+                "channel_thumbnail": channel_thumbnails.get(snippet.get("channelId", ""), ""),
+                "embeddable": status.get("embeddable", True),
             }
+        return metadata
 
-        item = data["items"][0]
-        snippet = item["snippet"]
-        status = item.get("status", {})
-        embeddable = status.get("embeddable", True)
-        channel_id = snippet.get("channelId", "")
-        channel_thumbnail = ""
-        if channel_id:
-            channel_thumbnail = await self._get_channel_thumbnail(channel_id)
-
-        return {
-            "title": snippet.get("title", ""),
-            "description": snippet.get("description", "")[:500],
-            "channel": snippet.get("channelTitle", ""),
-            "thumbnail": (
-                snippet.get("thumbnails", {}).get("maxres", {}).get("url")
-                or snippet.get("thumbnails", {}).get("high", {}).get("url", "")
-            ),
-            "channel_thumbnail": channel_thumbnail,
-            "embeddable": embeddable,
-        }
+    async def get_video_metadata(self, video_id: str) -> dict:
+        metadata = await self.get_videos_metadata([video_id])
+        return metadata.get(video_id) or _empty_metadata()
+
+    @staticmethod
+    def channel_cache_stats() -> dict:
+        return _channel_thumbnail_cache.stats()
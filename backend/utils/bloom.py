@@ -0,0 +1,64 @@
+import hashlib
+import math
+import zlib
+
+
+# fixed-size bloom filter; double hashing off one blake2b digest
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str) -> bool:
+        added = False
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def union(self, other: "BloomFilter") -> None:
+        if (other.num_bits, other.num_hashes) != (self.num_bits, self.num_hashes):
+            raise ValueError("bloom filters have different shapes")
+        merged = int.from_bytes(self.bits, "little") | int.from_bytes(other.bits, "little")
+        self.bits = bytearray(merged.to_bytes(len(self.bits), "little"))
+        self.count = max(self.count, other.count)
+
+    def fill_ratio(self) -> float:
+        return int.from_bytes(self.bits, "little").bit_count() / self.num_bits
+
+    def estimated_error_rate(self) -> float:
+        return self.fill_ratio() ** self.num_hashes
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(bytes(self.bits))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, capacity: int, error_rate: float, count: int = 0) -> "BloomFilter":
+        bloom = cls(capacity, error_rate)
+        bits = zlib.decompress(data)
+        if len(bits) != len(bloom.bits):
+            raise ValueError("bloom checkpoint does not match the configured capacity")
+        bloom.bits = bytearray(bits)
+        bloom.count = count
+        return bloom
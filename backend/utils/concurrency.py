@@ -0,0 +1,201 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator
+from utils.env import settings
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+_priority: ContextVar[int] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+# crawl/seed runs wrap themselves in this so /shorts/* requests jump the queue
+@contextmanager
+def batch_priority() -> Iterator[None]:
+    token = _priority.set(BATCH)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class PrioritySemaphore:
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self.active = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int = INTERACTIVE) -> None:
+        if self.active < self.limit and not self._pending():
+            self.active += 1
+            self.acquired += 1
+            return
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # the slot was handed over just as we were cancelled, pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # hand the slot straight to the next waiter, active count is unchanged
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _pending(self) -> int:
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+    def stats(self) -> dict:
+        waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                waiting[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": waiting,
+            "queue_depth": sum(waiting.values()),
+            "acquired": self.acquired,
+            "avg_wait_ms": round(1000 * self.total_wait / self.acquired, 1) if self.acquired else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait, 1),
+        }
+
+
+# per-stage limits on upstream calls, plus one shared cap across every stage
+class ConcurrencyController:
+    def __init__(self, stage_limits: dict[str, int], upstream_limit: int) -> None:
+        self._stages = {name: PrioritySemaphore(limit) for name, limit in stage_limits.items()}
+        self._upstream = PrioritySemaphore(upstream_limit)
+        self.throttled: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, stage: str, upstream: bool = True) -> AsyncIterator[None]:
+        priority = current_priority()
+        stage_sem = self._stages[stage]
+        await stage_sem.acquire(priority)
+        try:
+            if not upstream:
+                yield
+                return
+            await self._upstream.acquire(priority)
+            try:
+                yield
+            finally:
+                self._upstream.release()
+        finally:
+            stage_sem.release()
+
+    # upstreams call this on 429s; adaptive limiters watch the total to back off
+    def note_throttled(self, stage: str) -> None:
+        self.throttled[stage] = self.throttled.get(stage, 0) + 1
+
+    def throttle_count(self) -> int:
+        return sum(self.throttled.values())
+
+    def stats(self) -> dict:
+        return {
+            "throttled": dict(self.throttled),
+            "upstream": self._upstream.stats(),
+            "stages": {name: sem.stats() for name, sem in self._stages.items()},
+        }
+
+
+# AIMD: +1 slot per clean unit of work, halve when upstreams throttled while it ran
+class AdaptiveLimiter:
+    def __init__(self, initial: int, maximum: int, minimum: int = 1, cooldown: float = 5.0) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.cooldown = cooldown
+        self.active = 0
+        self.completed = 0
+        self.increases = 0
+        self.decreases = 0
+        self._decreased_at = 0.0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+        throttled_before = concurrency.throttle_count()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            throttled = concurrency.throttle_count() > throttled_before
+            async with self._cond:
+                self.active -= 1
+                self.completed += 1
+                if throttled or not ok:
+                    self._decrease()
+                else:
+                    self._increase()
+                self._cond.notify_all()
+
+    def _increase(self) -> None:
+        if self.limit < self.maximum:
+            self.limit = min(self.maximum, self.limit + 1)
+            self.increases += 1
+
+    def _decrease(self) -> None:
+        # one burst of 429s shows up in every in-flight unit; only back off once per cooldown
+        now = time.monotonic()
+        if now - self._decreased_at < self.cooldown:
+            return
+        self._decreased_at = now
+        self.limit = max(self.minimum, self.limit / 2)
+        self.decreases += 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "active": self.active,
+            "completed": self.completed,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
+
+
+concurrency = ConcurrencyController(
+    stage_limits={
+        "video": settings.MAX_CONCURRENT_VIDEOS,
+        "youtube": settings.YOUTUBE_CONCURRENCY,
+        "openai": settings.OPENAI_CONCURRENCY,
+        "kalshi": settings.KALSHI_CONCURRENCY,
+        # video job pipeline stages (local workers and cloud tasks deliveries alike)
+        "sanitize": settings.JOB_SANITIZE_CONCURRENCY,
+        "image": settings.JOB_IMAGE_CONCURRENCY,
+        "upload": settings.JOB_UPLOAD_CONCURRENCY,
+        "veo": settings.JOB_VEO_SUBMIT_CONCURRENCY,
+    },
+    upstream_limit=settings.UPSTREAM_CONCURRENCY,
+)
@@ -14,6 +14,57 @@ class Settings(BaseSettings):
     CLOUD_TASKS_LOCATION: str = "us-central1"
     WORKER_SERVICE_URL: str | None = None
     FRONTEND_URL: str = "http://localhost:5173"
+    LLM_CACHE_DIR: str = ""
+    LLM_CACHE_TTL: float = 86400.0
+    LLM_CACHE_MAX_ENTRIES: int = 4096
+    MAX_CONCURRENT_VIDEOS: int = 8
+    YOUTUBE_CONCURRENCY: int = 8
+    OPENAI_CONCURRENCY: int = 16
+    KALSHI_CONCURRENCY: int = 10
+    UPSTREAM_CONCURRENCY: int = 32
+    LLM_BACKEND: str = "openai"
+    LLM_FAKE_LATENCY_MS: int = 200
+    LLM_MODEL_CONCURRENCY: dict[str, int] = {"gpt-4o": 8, "gpt-4o-mini": 16}
+    LLM_MODEL_TPM: dict[str, int] = {"gpt-4o": 400_000, "gpt-4o-mini": 1_000_000}
+    LLM_KEYWORD_MODELS: list[str] = ["gpt-4o-mini", "gpt-4o"]
+    YOUTUBE_API_URL: str = "https://www.googleapis.com/youtube/v3"
+    YOUTUBE_DAILY_QUOTA: int = 10000
+    YOUTUBE_QUOTA_RESERVE: int = 1000
+    CRAWL_BATCH_SIZE: int = 20
+    CRAWL_MATCH_WORKERS: int = 16
+    SEEN_REGISTRY_CAPACITY: int = 500_000
+    SEEN_NO_MATCH_RETRY_HOURS: int = 72
+    SCHEDULER_ENABLED: bool = False
+    SCHEDULER_CRAWL_INTERVAL: float = 1800.0
+    SCHEDULER_CLEANUP_INTERVAL: float = 3600.0
+    SCHEDULER_REPRICE_INTERVAL: float = 600.0
+    SCHEDULER_JITTER: float = 0.1
+    JOB_WORKERS: int = 8
+    JOB_QUEUE_MAX: int = 200
+    JOB_SANITIZE_CONCURRENCY: int = 8
+    JOB_IMAGE_CONCURRENCY: int = 4
+    JOB_UPLOAD_CONCURRENCY: int = 4
+    JOB_VEO_SUBMIT_CONCURRENCY: int = 2
+    RENDER_REUSE_ENABLED: bool = True
+    RENDER_REUSE_MAX_AGE_HOURS: float = 168.0
+    FRAME_CACHE_MAX_AGE_DAYS: int = 30
+    FRAME_CACHE_MAX_ENTRIES: int = 5000
+    FRAME_CACHE_MEMORY_MB: int = 64
+    SCHEDULER_FRAME_EVICT_INTERVAL: float = 86400.0
+    IMAGE_CACHE_DIR: str = ""
+    IMAGE_CACHE_MAX_MB: int = 256
+    IMAGE_CACHE_FRESH_SECONDS: float = 3600.0
+    IMAGE_MAX_DOWNLOAD_MB: int = 15
+    VERTEX_BACKEND: str = "genai"
+    VERTEX_FAKE_LATENCY_MS: int = 300
+    VERTEX_FAKE_RENDER_SECONDS: float = 90.0
+    VERTEX_IMAGEN_TIMEOUT: float = 90.0
+    # generous on purpose: a submit we give up on may still have started a billed render
+    VERTEX_SUBMIT_TIMEOUT: float = 180.0
+    VERTEX_STATUS_TIMEOUT: float = 20.0
+    JOB_STATUS_CACHE_ENTRIES: int = 5000
+    JOB_STATUS_REMOTE_TTL: float = 5.0
+    JOB_STORE_FLUSH_DELAY: float = 2.0
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+import aiohttp
+from PIL import Image, ImageOps
+from utils.env import settings
+
+# veo renders 9:16 at 720p; anything bigger is just bytes we upload and it downscales
+FRAME_SIZE = (720, 1280)
+_JPEG_QUALITY = 88
+_CHUNK = 64 * 1024
+
+IMAGE_REQUEST_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+    ),
+    "Accept": "image/avif,image/webp,image/apng,image/png,image/jpeg,image/*,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def image_mime_type(data: bytes) -> str:
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+# center-crop to 9:16 and resize once, so veo and gcs both get the small version
+def normalize_frame(data: bytes) -> Optional[bytes]:
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            # lets the jpeg decoder skip straight to a nearby scale instead of full res
+            img.draft("RGB", FRAME_SIZE)
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            img = ImageOps.fit(img, FRAME_SIZE, method=Image.Resampling.LANCZOS, centering=(0.5, 0.5))
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=_JPEG_QUALITY, optimize=True, progressive=True)
+            return out.getvalue()
+    except Exception as e:
+        print(f"[image-ingest] Could not decode image ({len(data)} bytes): {e}", flush=True)
+        return None
+
+
+class _TooLarge(Exception):
+    pass
+
+
+# source images (mostly kalshi market art) fetched once, normalized, and kept on local
+# disk keyed by url. entries are revalidated with the etag once they go stale
+class ImageIngestCache:
+    def __init__(self, cache_dir: str, max_bytes: int, max_download_bytes: int, fresh_seconds: float) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_download_bytes = max_download_bytes
+        self.fresh_seconds = fresh_seconds
+        # key -> (size, last_used); rebuilt from disk on first use. the *_sync helpers run on
+        # to_thread workers concurrently, so every touch of it goes through _lock
+        self._entries: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._scanned = False
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.revalidated = 0
+        self.downloads = 0
+        self.bytes_downloaded = 0
+        self.bytes_normalized = 0
+        self.too_large = 0
+        self.failures = 0
+        self.undecodable = 0
+        self.evictions = 0
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return f"{base}.jpg", f"{base}.json"
+
+    def _scan_sync(self) -> None:
+        with self._lock:
+            if self._scanned:
+                return
+            self._scanned = True
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith(".jpg"):
+                        stat = os.stat(os.path.join(root, name))
+                        self._entries[name[:-4]] = (stat.st_size, stat.st_atime)
+
+    def _has_entry(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def _read_sync(self, key: str) -> tuple[Optional[bytes], dict]:
+        image_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(image_path, "rb") as f:
+                return f.read(), meta
+        except (OSError, ValueError):
+            return None, {}
+
+    def _write_sync(self, key: str, image: bytes, meta: dict) -> None:
+        image_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(image_path), exist_ok=True)
+        for path, payload, mode in ((image_path, image, "wb"), (meta_path, json.dumps(meta), "w")):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, mode) as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._entries[key] = (len(image), time.time())
+            self._evict_locked()
+
+    def _touch_sync(self, key: str, meta: Optional[dict] = None) -> None:
+        image_path, meta_path = self._paths(key)
+        if meta is not None:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+        try:
+            os.utime(image_path)
+        except OSError:
+            pass
+        with self._lock:
+            # evicted between the read and this touch: don't bring it back as a 0-byte ghost
+            if key in self._entries:
+                self._entries[key] = (self._entries[key][0], time.time())
+
+    def _evict_locked(self) -> None:
+        total = sum(size for size, _ in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            del self._entries[key]
+            total -= size
+            self.evictions += 1
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        parsed = urlparse((url or "").strip())
+        if parsed.scheme not in {"http", "https"} or not parsed.netloc:
+            return None
+        key = hashlib.sha256(url.strip().encode()).hexdigest()
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            image = await self._fetch(key, url.strip(), parsed)
+            future.set_result(image)
+            return image
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch(self, key: str, url: str, parsed) -> Optional[bytes]:
+        await asyncio.to_thread(self._scan_sync)
+        cached, meta = (None, {})
+        if self._has_entry(key):
+            cached, meta = await asyncio.to_thread(self._read_sync, key)
+        if cached and time.time() - meta.get("checked_at", 0) < self.fresh_seconds:
+            self.hits += 1
+            await asyncio.to_thread(self._touch_sync, key)
+            return cached
+
+        headers = {**IMAGE_REQUEST_HEADERS, "Referer": f"{parsed.scheme}://{parsed.netloc}/"}
+        if cached and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if cached and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            connector = aiohttp.TCPConnector(ssl=False)
+            async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=15), allow_redirects=True) as response:
+                    if response.status == 304 and cached:
+                        self.revalidated += 1
+                        await asyncio.to_thread(self._touch_sync, key, {**meta, "checked_at": time.time()})
+                        return cached
+                    if response.status != 200:
+                        return cached
+                    length = response.content_length
+                    if length and length > self.max_download_bytes:
+                        raise _TooLarge(length)
+                    chunks = []
+                    received = 0
+                    async for chunk in response.content.iter_chunked(_CHUNK):
+                        received += len(chunk)
+                        if received > self.max_download_bytes:
+                            raise _TooLarge(received)
+                        chunks.append(chunk)
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+        except _TooLarge as e:
+            self.too_large += 1
+            print(f"[image-ingest] {url[:80]} is over {self.max_download_bytes} bytes ({e}), skipping", flush=True)
+            return cached
+        except Exception as e:
+            self.failures += 1
+            print(f"Failed to fetch image from {url}: {e}", flush=True)
+            return cached
+
+        payload = b"".join(chunks)
+        self.downloads += 1
+        self.bytes_downloaded += len(payload)
+        image = await asyncio.to_thread(normalize_frame, payload)
+        if image:
+            self.bytes_normalized += len(image)
+        else:
+            # pillow can't read it (avif and friends); veo may still take the original
+            self.undecodable += 1
+            image = payload
+        try:
+            await asyncio.to_thread(self._write_sync, key, image, {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked_at": time.time(),
+                "source_bytes": len(payload),
+                "normalized": image is not payload,
+            })
+        except OSError as e:
+            print(f"[image-ingest] Failed to cache {url[:80]}: {e}", flush=True)
+        return image
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+            disk_bytes = sum(size for size, _ in self._entries.values())
+        return {
+            "entries": entries,
+            "disk_mb": round(disk_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "downloads": self.downloads,
+            "too_large": self.too_large,
+            "failures": self.failures,
+            "undecodable": self.undecodable,
+            "evictions": self.evictions,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_normalized": self.bytes_normalized,
+        }
+
+
+image_ingest = ImageIngestCache(
+    cache_dir=settings.IMAGE_CACHE_DIR or os.path.join(tempfile.gettempdir(), "image_ingest"),
+    max_bytes=settings.IMAGE_CACHE_MAX_MB * 1024 * 1024,
+    max_download_bytes=settings.IMAGE_MAX_DOWNLOAD_MB * 1024 * 1024,
+    fresh_seconds=settings.IMAGE_CACHE_FRESH_SECONDS,
+)
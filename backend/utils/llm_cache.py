@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Awaitable, Callable, Optional
+from utils.async_cache import AsyncTTLCache
+from utils.env import settings
+
+
+def make_cache_key(model: str, messages: list[dict], params: dict) -> str:
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def has_content(content: str) -> bool:
+    return bool(content and content.strip())
+
+
+# for callers that json.loads the completion (fenced or not); anything else isn't worth keeping
+def parses_as_json(content: str) -> bool:
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+    try:
+        json.loads(content)
+    except ValueError:
+        return False
+    return True
+
+
+# content-addressed cache for deterministic (temperature ~0) chat completions
+class LLMResponseCache:
+    def __init__(self, max_entries: int = 4096, ttl: float = 86400.0, disk_dir: str = "") -> None:
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_hits = 0
+        self._memory = AsyncTTLCache(max_entries=max_entries, ttl=ttl)
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    async def get_or_call(
+        self,
+        model: str,
+        messages: list[dict],
+        params: dict,
+        call: Callable[[], Awaitable[str]],
+        cache_if: Callable[[str], bool] = has_content,
+    ) -> str:
+        key = make_cache_key(model, messages, params)
+
+        async def load_or_call() -> str:
+            content = await self._read_disk(key)
+            if content is not None:
+                self.disk_hits += 1
+                return content
+            content = await call()
+            if cache_if(content):
+                await self._write_disk(key, content)
+            return content
+
+        return await self._memory.get_or_compute(key, load_or_call, cache_if=cache_if)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk_sync(self, key: str) -> Optional[str]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("expires_at", 0) <= time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get("content")
+
+    def _write_disk_sync(self, key: str, content: str) -> None:
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"expires_at": time.time() + self.ttl, "content": content}, f)
+        os.replace(tmp_path, path)
+
+    async def _read_disk(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        return await asyncio.to_thread(self._read_disk_sync, key)
+
+    async def _write_disk(self, key: str, content: str) -> None:
+        if not self.disk_dir:
+            return
+        try:
+            await asyncio.to_thread(self._write_disk_sync, key, content)
+        except OSError as e:
+            print(f"[llm_cache] Failed to write disk entry: {e}", flush=True)
+
+    def stats(self) -> dict:
+        return {**self._memory.stats(), "disk_hits": self.disk_hits, "disk_enabled": bool(self.disk_dir)}
+
+
+llm_cache = LLMResponseCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl=settings.LLM_CACHE_TTL,
+    disk_dir=settings.LLM_CACHE_DIR,
+)
@@ -0,0 +1,323 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Optional, Protocol
+from openai import AsyncOpenAI, RateLimitError
+from utils.concurrency import PrioritySemaphore, concurrency, current_priority
+from utils.env import settings
+from utils.llm_cache import has_content, llm_cache
+
+_DEFAULT_MAX_TOKENS = 256
+
+
+@dataclass
+class LLMResult:
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMBackend(Protocol):
+    async def complete(self, model: str, messages: list[dict], **params) -> LLMResult: ...
+
+    def stream(self, model: str, messages: list[dict], **params) -> AsyncIterator[str]: ...
+
+
+def estimate_tokens(messages: list[dict]) -> int:
+    # ~4 chars per token is close enough for budgeting
+    return sum(len(str(m.get("content", ""))) for m in messages) // 4 + 4 * len(messages)
+
+
+class OpenAIBackend:
+    def __init__(self, api_key: str) -> None:
+        self.client = AsyncOpenAI(api_key=api_key)
+
+    async def complete(self, model: str, messages: list[dict], **params) -> LLMResult:
+        response = await self.client.chat.completions.create(
+            model=model, messages=messages, **params
+        )
+        usage = response.usage
+        return LLMResult(
+            content=(response.choices[0].message.content or "").strip(),
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    async def stream(self, model: str, messages: list[dict], **params) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=model, messages=messages, stream=True, **params
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+# canned responses with a fixed latency, for load tests without an API key
+class FakeLLMBackend:
+    def __init__(
+        self,
+        latency: float = 0.2,
+        responder: Optional[Callable[[str, list[dict]], str]] = None,
+    ) -> None:
+        self.latency = latency
+        self.responder = responder or (lambda model, messages: "fake, response")
+        self.calls = 0
+
+    async def complete(self, model: str, messages: list[dict], **params) -> LLMResult:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        content = self.responder(model, messages)
+        return LLMResult(
+            content=content,
+            prompt_tokens=estimate_tokens(messages),
+            completion_tokens=len(content) // 4,
+        )
+
+    async def stream(self, model: str, messages: list[dict], **params) -> AsyncIterator[str]:
+        result = await self.complete(model, messages, **params)
+        for word in result.content.split(" "):
+            yield word + " "
+
+
+class TokenBudget:
+    def __init__(self, tokens_per_minute: int) -> None:
+        self.capacity = float(max(1, tokens_per_minute))
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # tokens are taken up front and the caller sleeps off the deficit afterwards, so later
+    # callers queue behind the debt without anyone sleeping on a lock
+    async def acquire(self, tokens: int) -> float:
+        tokens = min(float(tokens), self.capacity)
+        self._refill()
+        self.available -= tokens
+        delay = max(0.0, -self.available / self.rate)
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.available = min(self.capacity, self.available + tokens)
+                raise
+        return delay
+
+    def adjust(self, delta: int) -> None:
+        # settle the estimate against real usage; may go negative and stall the next caller
+        self._refill()
+        self.available = min(self.capacity, self.available - delta)
+
+
+class CallSiteStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.escalations = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.budget_wait = 0.0
+        self.latencies: deque[float] = deque(maxlen=500)
+        self.models: dict[str, int] = {}
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "escalations": self.escalations,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "budget_wait_ms": round(1000 * self.budget_wait, 1),
+            "latency_p50_ms": pct(0.5),
+            "latency_p95_ms": pct(0.95),
+            "models": dict(self.models),
+        }
+
+
+# every OpenAI call goes through here: one client, per-model limits, accounting, caching
+class LLMGateway:
+    def __init__(
+        self,
+        backend: LLMBackend,
+        model_concurrency: dict[str, int],
+        model_tpm: dict[str, int],
+        default_concurrency: int = 8,
+        default_tpm: int = 200_000,
+    ) -> None:
+        self.backend = backend
+        self.model_concurrency = model_concurrency
+        self.model_tpm = model_tpm
+        self.default_concurrency = default_concurrency
+        self.default_tpm = default_tpm
+        self._semaphores: dict[str, PrioritySemaphore] = {}
+        self._budgets: dict[str, TokenBudget] = {}
+        self._stats: dict[str, CallSiteStats] = {}
+
+    def _semaphore(self, model: str) -> PrioritySemaphore:
+        if model not in self._semaphores:
+            limit = self.model_concurrency.get(model, self.default_concurrency)
+            self._semaphores[model] = PrioritySemaphore(limit)
+        return self._semaphores[model]
+
+    def _budget(self, model: str) -> TokenBudget:
+        if model not in self._budgets:
+            self._budgets[model] = TokenBudget(self.model_tpm.get(model, self.default_tpm))
+        return self._budgets[model]
+
+    def _site(self, call_site: str) -> CallSiteStats:
+        if call_site not in self._stats:
+            self._stats[call_site] = CallSiteStats()
+        return self._stats[call_site]
+
+    async def _call(self, call_site: str, model: str, messages: list[dict], params: dict) -> str:
+        site = self._site(call_site)
+        estimate = estimate_tokens(messages) + int(params.get("max_tokens") or _DEFAULT_MAX_TOKENS)
+        semaphore = self._semaphore(model)
+        # wait out the tpm budget before taking slots, so one model over budget can't hold
+        # the shared openai slots while it sleeps
+        site.budget_wait += await self._budget(model).acquire(estimate)
+        # queue on the per-model semaphore first: waiting there while holding the shared
+        # openai slot would starve other models behind a saturated one
+        await semaphore.acquire(current_priority())
+        try:
+            async with concurrency.slot("openai"):
+                started = time.monotonic()
+                try:
+                    result = await self.backend.complete(model, messages, **params)
+                except Exception as e:
+                    site.errors += 1
+                    if isinstance(e, RateLimitError):
+                        concurrency.note_throttled("openai")
+                    raise
+        finally:
+            semaphore.release()
+        site.latencies.append(time.monotonic() - started)
+        site.calls += 1
+        site.models[model] = site.models.get(model, 0) + 1
+        site.prompt_tokens += result.prompt_tokens
+        site.completion_tokens += result.completion_tokens
+        if result.prompt_tokens or result.completion_tokens:
+            self._budget(model).adjust(result.prompt_tokens + result.completion_tokens - estimate)
+        return result.content
+
+    async def complete(
+        self,
+        call_site: str,
+        *,
+        model: str,
+        messages: list[dict],
+        cache: bool = False,
+        cache_if: Callable[[str], bool] = has_content,
+        **params,
+    ) -> str:
+        if not cache:
+            return await self._call(call_site, model, messages, params)
+        return await llm_cache.get_or_call(
+            model, messages, params,
+            lambda: self._call(call_site, model, messages, params),
+            cache_if=cache_if,
+        )
+
+    async def complete_tiered(
+        self,
+        call_site: str,
+        *,
+        models: list[str],
+        messages: list[dict],
+        accept: Callable[[str], bool],
+        cache: bool = False,
+        cache_if: Callable[[str], bool] = has_content,
+        **params,
+    ) -> str:
+        # try the cheap model first, escalate when its answer fails `accept`
+        content = ""
+        for i, model in enumerate(models):
+            try:
+                content = await self.complete(
+                    call_site, model=model, messages=messages, cache=cache, cache_if=cache_if, **params
+                )
+            except Exception:
+                if i == len(models) - 1:
+                    raise
+                self._site(call_site).escalations += 1
+                continue
+            if accept(content) or i == len(models) - 1:
+                return content
+            self._site(call_site).escalations += 1
+            print(f"[llm] {call_site}: {model} answer rejected, escalating to {models[i + 1]}", flush=True)
+        return content
+
+    async def stream(
+        self,
+        call_site: str,
+        *,
+        model: str,
+        messages: list[dict],
+        **params,
+    ) -> AsyncIterator[str]:
+        site = self._site(call_site)
+        estimate = estimate_tokens(messages) + int(params.get("max_tokens") or _DEFAULT_MAX_TOKENS)
+        semaphore = self._semaphore(model)
+        completion_chars = 0
+        site.budget_wait += await self._budget(model).acquire(estimate)
+        await semaphore.acquire(current_priority())
+        try:
+            async with concurrency.slot("openai"):
+                started = time.monotonic()
+                try:
+                    async for delta in self.backend.stream(model, messages, **params):
+                        completion_chars += len(delta)
+                        yield delta
+                except Exception:
+                    site.errors += 1
+                    raise
+        finally:
+            semaphore.release()
+        site.latencies.append(time.monotonic() - started)
+        site.calls += 1
+        site.models[model] = site.models.get(model, 0) + 1
+        site.prompt_tokens += estimate_tokens(messages)
+        site.completion_tokens += completion_chars // 4
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "call_sites": {name: s.snapshot() for name, s in self._stats.items()},
+            "models": {
+                model: {
+                    **sem.stats(),
+                    "tpm_available": int(self._budget(model).available),
+                    "tpm_limit": int(self._budget(model).capacity),
+                }
+                for model, sem in self._semaphores.items()
+            },
+            "cache": llm_cache.stats(),
+        }
+
+
+def _build_backend() -> LLMBackend:
+    if settings.LLM_BACKEND == "fake":
+        print("[llm] Using fake LLM backend", flush=True)
+        return FakeLLMBackend(latency=settings.LLM_FAKE_LATENCY_MS / 1000)
+    return OpenAIBackend(api_key=settings.OPENAI_API_KEY)
+
+
+llm_gateway = LLMGateway(
+    backend=_build_backend(),
+    model_concurrency=settings.LLM_MODEL_CONCURRENCY,
+    model_tpm=settings.LLM_MODEL_TPM,
+)
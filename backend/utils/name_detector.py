@@ -0,0 +1,147 @@
+import re
+from typing import Iterable
+
+# words that show up capitalized in market titles but never refer to a person
+_COMMON_WORDS = frozenset("""
+a about above after against all almost an and any are as at be been before below between
+beat beats best big by can close closes come comes cut cuts day days do does down drop drops
+during each end ends hike hikes hold holds raise raises
+every fall falls final first for from game games get gets go goes has have high higher hit hits
+how if in into is it its last least less low lower make makes market markets more most new next
+no not of off on one or out over pass passes per percent point points price prices rate rates
+reach reaches record rise rises run runs score scores season see set sign signs since so than
+that the their then there this through to today tonight top total under up us vs versus was
+week weeks what when where which who will win wins with won world year years yes
+january february march april may june july august september october november december
+monday tuesday wednesday thursday friday saturday sunday
+jan feb mar apr jun jul aug sep sept oct nov dec
+bitcoin btc ethereum eth crypto xrp solana dogecoin stock stocks nasdaq dow s&p gdp cpi
+inflation recession fed interest unemployment tariff tariffs oil gas gold
+election presidential senate house congress party democrat democrats
+republican republicans primary vote votes supreme court bill law
+nfl nba mlb nhl fifa ufc mls super bowl cup championship finals playoffs league series
+team teams
+hurricane storm tornado earthquake snow rain temperature weather climate wildfire flood
+ai openai google apple tesla nvidia microsoft amazon meta spacex nasa mars moon rocket launch
+album song movie box office oscar oscars grammy grammys tv show
+""".split())
+
+# a role still points at one real person ("the president", "the mvp"), and the sanitizer
+# has to rewrite those too
+_ROLE_WORDS = frozenset("""
+president vice governor mayor senator senators congressman congresswoman representative speaker
+secretary minister chancellor premier ceo founder chairman chairwoman owner coach manager
+pope king queen prince princess judge justice mvp quarterback qb pitcher rapper singer
+""".split())
+
+# all-caps tokens that are safe to read as acronyms; any other (SGA, AOC, LBJ) may be a person
+_ACRONYMS = frozenset("""
+nfl nba mlb nhl fifa ufc mls ncaa wnba pga nascar f1 us usa uk eu un nato gdp cpi ppi fed
+btc eth xrp s&p etf ipo ai tv nasa fda sec ftc doj irs
+""".split())
+
+# not inside numbers: "$100k" shouldn't yield a "k"
+_TOKEN_RE = re.compile(r"(?<![0-9])[A-Za-z][A-Za-z'&.\-]*")
+_SENTENCE_BREAK_RE = re.compile(r"[.?!:;\-–—]\s*$")
+
+_learned_common: set[str] = set()
+_gazetteer: set[str] = set()
+
+
+def _normalize(token: str) -> str:
+    token = token.strip(".-'")
+    if token.lower().endswith("'s"):
+        token = token[:-2]
+    return token.lower()
+
+
+def _tokens_with_position(text: str) -> list[tuple[str, bool]]:
+    # (token, starts a sentence)
+    result = []
+    last_end = 0
+    for match in _TOKEN_RE.finditer(text):
+        before = text[last_end:match.start()]
+        starts_sentence = not result or bool(_SENTENCE_BREAK_RE.search(before))
+        result.append((match.group(), starts_sentence))
+        last_end = match.end()
+    return result
+
+
+def _is_known_word(word: str) -> bool:
+    return word in _COMMON_WORDS or word in _learned_common
+
+
+def _capitalized_runs(text: str, skip_sentence_start: bool) -> list[list[str]]:
+    runs: list[list[str]] = []
+    current: list[str] = []
+    for token, starts_sentence in _tokens_with_position(text):
+        capitalized = token[0].isupper() and not token.isupper()
+        if capitalized and not (skip_sentence_start and starts_sentence):
+            current.append(_normalize(token))
+            continue
+        if current:
+            runs.append(current)
+        current = []
+    if current:
+        runs.append(current)
+    return runs
+
+
+# learn vocabulary and likely person names from Kalshi event titles / outcome subtitles
+def update_gazetteer(titles: Iterable[str], subtitles: Iterable[str] = ()) -> int:
+    titles = [t for t in titles if t]
+    subtitles = [t for t in subtitles if t]
+    for text in titles + subtitles:
+        for token, _ in _tokens_with_position(text):
+            if token.islower():
+                _learned_common.add(_normalize(token))
+
+    before = len(_gazetteer)
+    for text, skip_start in [(t, True) for t in titles] + [(t, False) for t in subtitles]:
+        for run in _capitalized_runs(text, skip_sentence_start=skip_start):
+            # only the fixed vocabulary vetoes a name; a word learned from some lowercase
+            # title ("swift", "bush") is still a surname when it shows up capitalized
+            if any(w in _COMMON_WORDS for w in run):
+                continue
+            if len(run) == 1 and len(run[0]) < 4:
+                continue
+            _gazetteer.add(" ".join(run))
+            if len(run[-1]) >= 4:
+                _gazetteer.add(run[-1])
+    return len(_gazetteer) - before
+
+
+def gazetteer_size() -> int:
+    return len(_gazetteer)
+
+
+def mentions_known_figure(text: str) -> bool:
+    words = [_normalize(t) for t, _ in _tokens_with_position(text)]
+    for size in (3, 2, 1):
+        for i in range(len(words) - size + 1):
+            if " ".join(words[i : i + size]) in _gazetteer:
+                return True
+    return False
+
+
+# True only when nothing in the text could plausibly be a person's name or role. anything
+# unrecognized counts as ambiguous: lowercase names ("elon musk") look like any other word
+def is_confidently_people_free(text: str) -> bool:
+    if mentions_known_figure(text):
+        return False
+    for token, _ in _tokens_with_position(text):
+        word = _normalize(token)
+        if not word:
+            continue
+        if word in _ROLE_WORDS:
+            return False
+        if len(token) > 1 and token.isupper():
+            if word not in _ACRONYMS:
+                return False
+        elif token[0].isupper():
+            # learned words only vouch for lowercase use
+            if word not in _COMMON_WORDS:
+                return False
+        elif not _is_known_word(word):
+            return False
+    return True
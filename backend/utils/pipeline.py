@@ -0,0 +1,156 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+_DONE = object()
+_EMPTY = object()
+
+
+@dataclass
+class Stage:
+    name: str
+    # takes one item (or a list when batch_size > 1) and returns the items to pass on
+    handler: Callable[[Any], Awaitable[Iterable[Any]]]
+    workers: int = 1
+    queue_size: int = 100
+    batch_size: int = 1
+    max_wait: float = 0.5
+
+
+class _StageStats:
+    def __init__(self, stage: Stage) -> None:
+        self.stage = stage
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=stage.queue_size)
+        self.received = 0
+        self.emitted = 0
+        self.errors = 0
+        self.calls = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.first_started = 0.0
+        self.last_finished = 0.0
+
+
+async def _get_with_timeout(queue: asyncio.Queue, timeout: float) -> Any:
+    getter = asyncio.ensure_future(queue.get())
+    done, _ = await asyncio.wait({getter}, timeout=timeout)
+    if getter in done:
+        return getter.result()
+    getter.cancel()
+    try:
+        # the item may have landed between the timeout and the cancel
+        return await getter
+    except asyncio.CancelledError:
+        return _EMPTY
+
+
+# chain of bounded queues, one per stage. a full queue blocks the stage feeding it, so a
+# slow upstream (say openai) holds back search instead of piling work up in memory
+class Pipeline:
+    def __init__(self, name: str, stages: list[Stage]) -> None:
+        self.name = name
+        self._stages = [_StageStats(stage) for stage in stages]
+        self.outputs: list[Any] = []
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+    async def run(self, inputs: Iterable[Any]) -> list[Any]:
+        self.started_at = time.monotonic()
+        workers = [
+            [asyncio.create_task(self._worker(i)) for _ in range(stats.stage.workers)]
+            for i, stats in enumerate(self._stages)
+        ]
+        try:
+            first = self._stages[0]
+            for item in inputs:
+                await first.queue.put(item)
+            for i, stage_workers in enumerate(workers):
+                for _ in stage_workers:
+                    await self._stages[i].queue.put(_DONE)
+                # downstream only hears it's done once every worker here has drained
+                await asyncio.gather(*stage_workers)
+        finally:
+            for stage_workers in workers:
+                for task in stage_workers:
+                    task.cancel()
+            self.finished_at = time.monotonic()
+        return self.outputs
+
+    async def _worker(self, index: int) -> None:
+        stats = self._stages[index]
+        stage = stats.stage
+        downstream = self._stages[index + 1] if index + 1 < len(self._stages) else None
+        done = False
+        while not done:
+            item = await stats.queue.get()
+            if item is _DONE:
+                return
+            batch = [item]
+            deadline = time.monotonic() + stage.max_wait
+            while len(batch) < stage.batch_size:
+                item = await _get_with_timeout(stats.queue, deadline - time.monotonic())
+                if item is _EMPTY:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+
+            stats.received += len(batch)
+            stats.calls += 1
+            started = time.monotonic()
+            if not stats.first_started:
+                stats.first_started = started
+            try:
+                results = list(await stage.handler(batch if stage.batch_size > 1 else batch[0]) or [])
+            except Exception as e:
+                stats.errors += 1
+                print(f"[{self.name}:{stage.name}] {len(batch)} items failed: {e}", flush=True)
+                results = []
+            finally:
+                stats.last_finished = time.monotonic()
+                stats.busy += stats.last_finished - started
+
+            stats.emitted += len(results)
+            if downstream is None:
+                self.outputs.extend(results)
+                continue
+            started = time.monotonic()
+            for result in results:
+                await downstream.queue.put(result)
+            stats.blocked += time.monotonic() - started
+
+    # wall time from the first call into any of these stages to the last one returning
+    def span(self, *names: str) -> float:
+        picked = [stats for stats in self._stages if stats.stage.name in names and stats.calls]
+        if not picked:
+            return 0.0
+        return max(s.last_finished for s in picked) - min(s.first_started for s in picked)
+
+    def stats(self) -> dict:
+        end = self.finished_at or time.monotonic()
+        elapsed = max(end - self.started_at, 1e-6) if self.started_at else 0.0
+        stages = {}
+        for stats in self._stages:
+            stage = stats.stage
+            stages[stage.name] = {
+                "workers": stage.workers,
+                "queue_depth": stats.queue.qsize(),
+                "queue_size": stage.queue_size,
+                "received": stats.received,
+                "emitted": stats.emitted,
+                "errors": stats.errors,
+                "per_sec": round(stats.received / elapsed, 2) if elapsed else 0.0,
+                "avg_call_ms": round(1000 * stats.busy / stats.calls, 1) if stats.calls else 0.0,
+                # near 1.0 = this stage is the bottleneck; high blocked_s = the next one is
+                "utilization": round(stats.busy / (stage.workers * elapsed), 3) if elapsed else 0.0,
+                "blocked_s": round(stats.blocked, 2),
+                "active_s": round(self.span(stage.name), 2),
+            }
+        return {
+            "name": self.name,
+            "running": bool(self.started_at) and not self.finished_at,
+            "elapsed_s": round(elapsed, 2),
+            "stages": stages,
+        }
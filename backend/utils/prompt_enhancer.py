@@ -1,9 +1,9 @@
 import json
+import re
 from dataclasses import dataclass
-from openai import AsyncOpenAI
-from utils.env import settings
-
-_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+from utils.llm_cache import parses_as_json
+from utils.llm_gateway import llm_gateway
+from utils.name_detector import is_confidently_people_free
 
 
 DETECT_AND_SANITIZE_PROMPT = """You analyze prompts for an AI video generator that CANNOT reference real people AT ALL — not by name, not by description, not by role.
@@ -48,13 +48,38 @@ def _names_leak_check(detected_names: list[str], safe_title: str, safe_outcome:
     return False
 
 
+_YES_PREFIX_RE = re.compile(r"^\s*yes\s*[-:–—]\s*", re.IGNORECASE)
+_NO_PREFIX_RE = re.compile(r"^\s*no\s*[-:–—]\s*", re.IGNORECASE)
+
+
+# skip the LLM when the text obviously has no people in it
+def detect_locally(title: str, outcome: str) -> PromptAnalysis | None:
+    if _NO_PREFIX_RE.match(outcome):
+        return None  # negations need rewording, leave that to the LLM
+    clean_outcome = _YES_PREFIX_RE.sub("", outcome).strip() or outcome
+    if not is_confidently_people_free(title) or not is_confidently_people_free(clean_outcome):
+        return None
+    return PromptAnalysis(
+        has_real_people=False,
+        detected_names=[],
+        safe_title=title,
+        safe_outcome=clean_outcome,
+    )
+
+
 # veo not letting celebrities part 2
 async def detect_and_sanitize(title: str, outcome: str) -> PromptAnalysis:
+    local = detect_locally(title, outcome)
+    if local:
+        print(f"[prompt_enhancer] Local check: no people in \"{title}\" — skipping LLM", flush=True)
+        return local
+
     user_message = f"""Title: {title}
 Outcome: {outcome}"""
 
     try:
-        response = await _client.chat.completions.create(
+        content = await llm_gateway.complete(
+            "sanitize",
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": DETECT_AND_SANITIZE_PROMPT},
@@ -62,8 +87,9 @@ Outcome: {outcome}"""
             ],
             temperature=0.2,
             max_tokens=300,
+            cache=True,
+            cache_if=parses_as_json,
         )
-        content = response.choices[0].message.content.strip()
         if content.startswith("```"):
             content = content.split("```")[1]
             if content.startswith("json"):
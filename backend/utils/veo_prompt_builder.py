@@ -1,3 +1,8 @@
+# part of the render reuse key: bump when this prompt or the starting-frame prompt changes
+# so videos rendered from the old wording stop being handed out
+PROMPT_VERSION = 1
+
+
 def _domain_specific_rules(title: str, outcome: str) -> str:
     text = f"{title} {outcome}".lower()
 